@@ -1 +1,2 @@
 from .camera_source import CameraSource
+from .pipeline import FramePipeline
@@ -20,19 +20,25 @@ class CameraSource:
         if not self.cap.isOpened():
             raise RuntimeError(f"Could not open camera source {source}")
 
+        buffered = self.cap.get(cv2.CAP_PROP_BUFFERSIZE)
+        if buffered > 1:
+            print(f"Note: capture backend kept a {int(buffered)}-frame buffer; frames may lag.")
+
         self.latest_frame = None
+        self.frame_id = 0  # Incremented per captured frame
         self.status = False
         self.running = True
         self.lock = threading.Lock()
+        self.new_frame = threading.Condition(self.lock)
 
         # Start background thread to read frames
         self.thread = threading.Thread(target=self._update, daemon=True)
         self.thread.start()
         
         # Wait for first frame
-        start = time.time()
+        start = time.monotonic()
         while self.latest_frame is None:
-            if time.time() - start > 5.0:
+            if time.monotonic() - start > 5.0:
                 print("Warning: Camera source timed out getting first frame.")
                 break
             time.sleep(0.1)
@@ -52,11 +58,13 @@ class CameraSource:
                         
                     with self.lock:
                         self.latest_frame = frame
+                        self.frame_id += 1
                         self.status = True
+                        self.new_frame.notify_all()
                 else:
                     self.status = False
                     # potentially reconnect logic here if needed
-                    pass
+                    time.sleep(0.01)
             else:
                 time.sleep(0.1)
 
@@ -66,6 +74,18 @@ class CameraSource:
                 return self.latest_frame.copy()
             return None
 
+    def get_new_frame(self, last_id, timeout=0.5):
+        """
+        Wait for a frame newer than last_id.
+
+        Returns (frame_id, frame); frame is None if nothing new arrived in time.
+        Lets consumers skip re-processing a frame they have already seen.
+        """
+        with self.new_frame:
+            if not self.new_frame.wait_for(lambda: self.frame_id != last_id, timeout):
+                return last_id, None
+            return self.frame_id, self.latest_frame.copy()
+
     def release(self):
         self.running = False
         if self.thread.is_alive():
@@ -0,0 +1,169 @@
+"""
+Frame Pipeline
+Runs capture, processing and display on separate threads with bounded queues:
+reading frame N+1 and showing frame N-1 overlap with the work on frame N.
+Display stays on the main thread, which HighGUI requires on macOS.
+"""
+
+import cv2
+import sys
+import time
+import queue
+import threading
+
+# pollKey pumps GUI events like waitKey(1) but without its minimum 1 ms sleep;
+# older OpenCV builds lack it
+_poll_key = getattr(cv2, "pollKey", None) or (lambda: cv2.waitKey(1))
+
+
+class FramePipeline:
+    """
+    Three-stage pipeline: reader thread -> caller's loop -> display.
+
+    The caller passes its frame loop to run(), which runs it on a worker thread
+    and drives the window from the calling (main) thread until the loop returns.
+    The loop exchanges frames through get_frame() / show() and should exit once
+    running turns False.
+
+    With window_name=None the pipeline is headless: run() calls the loop on the
+    calling thread, show() is a no-op, visible stays False and keys come from
+    stdin lines.
+    """
+
+    def __init__(self, camera, window_name, depth=2):
+        """
+        Args:
+            camera: CameraSource (anything with get_frame())
+            window_name: HighGUI window run() drives, or None
+                         for headless
+            depth: Capacity of the read queue (back-pressure on capture)
+        """
+        self.camera = camera
+        self.window_name = window_name
+        self.read_q = queue.Queue(maxsize=depth)
+        # Single slot, newest wins: a slow GUI drops frames instead of stalling the loop
+        self.display_q = queue.Queue(maxsize=1)
+        self.key_q = queue.Queue()
+        self.stopped = threading.Event()
+        self.headless = window_name is None
+        # False while the window is minimized/hidden (always, headless);
+        # callers can skip drawing
+        self.visible = not self.headless
+        self._threads = [threading.Thread(target=self._reader, name="memo-reader", daemon=True)]
+
+    def start(self):
+        for t in self._threads:
+            t.start()
+        if self.headless:
+            # Blocks in readline, so it is never joined; daemon lets the process exit
+            threading.Thread(target=self._stdin_keys, name="memo-stdin", daemon=True).start()
+        return self
+
+    def _reader(self):
+        get_new = getattr(self.camera, "get_new_frame", None)
+        last_id = 0
+        while not self.stopped.is_set():
+            if get_new:
+                # Only forward frames the camera has not handed out yet
+                last_id, frame = get_new(last_id, timeout=0.1)
+            else:
+                frame = self.camera.get_frame()
+            if frame is None:
+                time.sleep(0.01)
+                continue
+            try:
+                self.read_q.put(frame, timeout=0.1)
+            except queue.Full:
+                pass  # Consumer is behind; the next read is fresher anyway
+
+    @property
+    def running(self):
+        return not self.stopped.is_set()
+
+    def run(self, loop):
+        """
+        Run loop() (the caller's per-frame processing) on a worker thread and
+        the window on this one, until loop returns or the pipeline is stopped.
+        Call it from the main thread. Exceptions from loop are re-raised here.
+        """
+        if self.headless:
+            loop()
+            return
+        errors = []
+
+        def work():
+            try:
+                loop()
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                self.stopped.set()  # Ends the display loop
+
+        worker = threading.Thread(target=work, name="memo-worker", daemon=True)
+        worker.start()
+        try:
+            self._display()
+        finally:
+            # Ctrl+C lands on this thread; let the loop finish its frame first
+            self.stopped.set()
+            worker.join(timeout=5.0)
+        if errors:
+            raise errors[0]
+
+    def _display(self):
+        cv2.namedWindow(self.window_name)
+        while not self.stopped.is_set():
+            try:
+                cv2.imshow(self.window_name, self.display_q.get(timeout=0.05))
+            except queue.Empty:
+                pass
+            # Pump the GUI even without a new frame so keys still register
+            key = _poll_key() & 0xFF
+            if key != 255:
+                self.key_q.put(key)
+            # 0 = hidden; backends without the property report -1, treat as visible
+            self.visible = cv2.getWindowProperty(self.window_name, cv2.WND_PROP_VISIBLE) != 0
+        cv2.destroyWindow(self.window_name)
+
+    def _stdin_keys(self):
+        # Line-buffered: "q" + Enter quits, like pressing q in the window
+        for line in sys.stdin:
+            if self.stopped.is_set():
+                break
+            line = line.strip()
+            if line:
+                self.key_q.put(ord(line[0]))
+
+    def get_frame(self, timeout=0.1):
+        """Next captured frame, or None if none arrived within timeout."""
+        try:
+            return self.read_q.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def show(self, frame):
+        """Hand a finished frame to the display loop, replacing any unshown one."""
+        if self.headless:
+            return
+        while True:
+            try:
+                self.display_q.put_nowait(frame)
+                return
+            except queue.Full:
+                try:
+                    self.display_q.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get_key(self):
+        """Oldest pending key press, or 255 if there is none."""
+        try:
+            return self.key_q.get_nowait()
+        except queue.Empty:
+            return 255
+
+    def stop(self):
+        self.stopped.set()
+        for t in self._threads:
+            if t.is_alive():
+                t.join(timeout=1.0)
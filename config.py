@@ -32,6 +32,8 @@ class PerceptionConfig:
     enable_emotion: bool = True
     enable_gestures: bool = True
     enable_motion: bool = True
+    motion_skip: int = 2  # Run motion detection every Nth frame
+    device: str = "auto"  # Inference device: auto, cpu, cuda, mps
 
 
 @dataclass
@@ -55,6 +57,8 @@ class DashboardConfig:
     debug: bool = False
     enable_auth: bool = False
     password: Optional[str] = None
+    stream_quality: int = 50  # JPEG quality of the video feed
+    stream_height: int = 270  # Video feed height; width follows the camera aspect
 
 
 @dataclass
@@ -186,6 +190,12 @@ class MEMOConfig:
         if self.perception.frame_skip < 1:
             errors.append("Frame skip must be >= 1")
         
+        if self.perception.motion_skip < 1:
+            errors.append("Motion skip must be >= 1")
+        
+        if self.perception.device not in ['auto', 'cpu', 'cuda', 'mps']:
+            errors.append(f"Invalid perception device: {self.perception.device}")
+        
         if not (0 <= self.perception.face_threshold <= 1):
             errors.append("Face threshold must be between 0 and 1")
         
@@ -197,6 +207,12 @@ class MEMOConfig:
         if not (1024 <= self.dashboard.port <= 65535):
             errors.append("Dashboard port must be between 1024 and 65535")
         
+        if not (1 <= self.dashboard.stream_quality <= 100):
+            errors.append("Dashboard stream quality must be between 1 and 100")
+        
+        if self.dashboard.stream_height < 120:
+            errors.append("Dashboard stream height too low (min 120)")
+        
         # System validation
         valid_log_levels = ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']
         if self.system.logging_level not in valid_log_levels:
@@ -17,6 +17,9 @@ from .personality import (
     get_personality
 )
 
+from .response_cache import ResponseCache
+from .intent_router import IntentRouter
+
 __all__ = [
     'EventBus',
     'EventType', 
@@ -29,5 +32,7 @@ __all__ = [
     'AIPersonality',
     'Conversation',
     'init_personality',
-    'get_personality'
+    'get_personality',
+    'ResponseCache',
+    'IntentRouter'
 ]
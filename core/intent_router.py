@@ -0,0 +1,127 @@
+"""
+MEMO - Intent Router
+====================
+Embedding-based intent classification for prompts the keyword scan misses
+("explain gravity" is a fact question without saying "what is").
+
+Runs an INT8-quantized MiniLM through ONNX Runtime and compares the prompt
+vector against one centroid per intent. Enabled only when onnxruntime,
+tokenizers and numpy are installed and the model directory exists.
+"""
+
+import os
+import logging
+import functools
+from typing import Optional
+
+# Child of the personality logger, so records share its console handler
+log = logging.getLogger("memo.personality.intent_router")
+
+# Optional dependencies
+HAS_NUMPY = False
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    pass
+
+HAS_ONNXRUNTIME = False
+try:
+    import onnxruntime
+    HAS_ONNXRUNTIME = True
+except ImportError:
+    pass
+
+HAS_TOKENIZERS = False
+try:
+    from tokenizers import Tokenizer
+    HAS_TOKENIZERS = True
+except ImportError:
+    pass
+
+# Directory holding an int8 all-MiniLM-L6-v2 export: model.onnx + tokenizer.json
+MODEL_DIR = "models/minilm-int8"
+
+# A handful of example prompts per intent; their mean vector is the centroid.
+# Only open-ended intents: datetime and math answers are computed locally, so
+# those stay on the exact keyword path rather than a similarity guess
+INTENT_EXAMPLES = {
+    "fact": (
+        "explain gravity", "tell me about the moon", "how do vaccines work",
+        "why is the sky blue", "define photosynthesis", "how far away is mars",
+        "who invented the telephone", "describe how a cpu works",
+        "what causes earthquakes", "history of the roman empire",
+    ),
+    "chat": (
+        "how are you", "i'm bored", "tell me a joke", "i had a rough morning",
+        "you're funny", "let's hang out", "guess what happened",
+        "i'm so tired", "thanks buddy", "what should i do now",
+    ),
+}
+
+
+class IntentRouter:
+    """Nearest-centroid intent classifier over quantized sentence embeddings."""
+
+    def __init__(self, model_dir: str = MODEL_DIR, threshold: float = 0.5):
+        """
+        Args:
+            model_dir: Directory with model.onnx (int8) and tokenizer.json
+            threshold: Minimum cosine similarity to accept an intent
+        """
+        self.threshold = threshold
+        self.enabled = False
+        self._session = None
+        self._tokenizer = None
+        self._labels = tuple(INTENT_EXAMPLES)
+        self._centroids = None
+
+        if not (HAS_NUMPY and HAS_ONNXRUNTIME and HAS_TOKENIZERS):
+            return
+        model_path = os.path.join(model_dir, "model.onnx")
+        tokenizer_path = os.path.join(model_dir, "tokenizer.json")
+        if not (os.path.exists(model_path) and os.path.exists(tokenizer_path)):
+            return
+
+        try:
+            self._session = onnxruntime.InferenceSession(
+                model_path, providers=["CPUExecutionProvider"]
+            )
+            self._input_names = {i.name for i in self._session.get_inputs()}
+            self._tokenizer = Tokenizer.from_file(tokenizer_path)
+            self._tokenizer.enable_truncation(max_length=64)
+            self._centroids = np.stack([
+                self._normalize(self._encode_batch(examples).mean(axis=0))
+                for examples in INTENT_EXAMPLES.values()
+            ])
+            self.enabled = True
+            log.info("✓ Intent router loaded (%s).", model_dir)
+        except Exception as e:
+            log.info("Intent router disabled: %s", e)
+
+    @staticmethod
+    def _normalize(vec):
+        return vec / (np.linalg.norm(vec, axis=-1, keepdims=True) + 1e-9)
+
+    def _encode_batch(self, texts):
+        """Mean-pooled, L2-normalized embeddings, shape (len(texts), 384)."""
+        self._tokenizer.enable_padding()
+        encodings = self._tokenizer.encode_batch(list(texts))
+        ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": ids, "attention_mask": mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.zeros_like(ids)
+        hidden = self._session.run(None, feeds)[0]
+        weights = mask[..., None].astype(np.float32)
+        pooled = (hidden * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+        return self._normalize(pooled.astype(np.float32))
+
+    @functools.lru_cache(maxsize=64)
+    def classify(self, q: str) -> Optional[str]:
+        """Best-matching intent for `q`, or None if disabled or below threshold."""
+        if not self.enabled:
+            return None
+        scores = self._centroids @ self._encode_batch((q,))[0]
+        best = int(scores.argmax())
+        return self._labels[best] if scores[best] >= self.threshold else None
@@ -8,24 +8,39 @@ Not a productivity robot - a companion who vibes with you.
 """
 
 import os
+import re
+import ast
+import sys
 import json
 import time
 import random
+import logging
+import bisect
+import hashlib
+import functools
+from collections import deque
+from itertools import islice
+from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Deque
 import threading
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
 
-PROFILE_PATH = "data/user_profile.json"
+from .response_cache import ResponseCache
+from .intent_router import IntentRouter, MODEL_DIR as INTENT_MODEL_DIR
 
-def load_profile():
-    if os.path.exists(PROFILE_PATH):
-        with open(PROFILE_PATH, "r") as f:
-            return json.load(f)
-    return {}
+# Optional: C Aho-Corasick automaton for intent keywords
+HAS_AHOCORASICK = False
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    pass
 
-def save_profile(profile):
-    with open(PROFILE_PATH, "w") as f:
-        json.dump(profile, f, indent=2)
+# No handler of its own: records propagate to the "memo" logger, which
+# utils.setup_logging() wires to the app's console and log file
+log = logging.getLogger("memo.personality")
 
 # =========================
 # Helper utilities
@@ -44,18 +59,47 @@ def save_profile(profile):
         json.dump(profile, f, indent=2)
 
 
-import requests
+# Heavy imports are resolved on first use, once, so fallback/cached runs skip them
+@functools.lru_cache(maxsize=None)
+def _get_requests():
+    import requests
+    return requests
+
+@functools.lru_cache(maxsize=None)
+def _get_genai_new():
+    from google import genai
+    return genai
+
+@functools.lru_cache(maxsize=None)
+def _get_genai_legacy():
+    import google.generativeai as genai  # pulls in gRPC/protobuf
+    return genai
+
+@functools.lru_cache(maxsize=None)
+def _get_add_log():
+    from interface.dashboard import add_log  # imports Flask/SocketIO
+    return add_log
+
+# One keep-alive session for the news feeds (several calls per host per update)
+_feeds_http = None
+
+def _feed_session():
+    global _feeds_http
+    if _feeds_http is None:
+        _feeds_http = _get_requests().Session()
+    return _feeds_http
+
 
 HEADERS = {"User-Agent": "memo"}
 
 def fetch_reddit_hot(sub):
     try:
-        import requests
+        http = _feed_session()
 
         url = f"https://www.reddit.com/r/{sub}/hot.json?limit=5"
         headers = {"User-Agent": "MEMO/1.0"}
 
-        r = requests.get(url, headers=headers, timeout=5)
+        r = http.get(url, headers=headers, timeout=5)
         if r.status_code != 200:
             return []
 
@@ -77,9 +121,9 @@ def fetch_reddit_hot(sub):
 
 def fetch_hackernews():
     try:
-        import requests
+        http = _feed_session()
 
-        top_ids = requests.get(
+        top_ids = http.get(
             "https://hacker-news.firebaseio.com/v0/topstories.json",
             timeout=5
         ).json()[:5]
@@ -87,7 +131,7 @@ def fetch_hackernews():
         stories = []
 
         for sid in top_ids:
-            item = requests.get(
+            item = http.get(
                 f"https://hacker-news.firebaseio.com/v0/item/{sid}.json",
                 timeout=5
             ).json()
@@ -104,10 +148,10 @@ def fetch_hackernews():
 
 def fetch_github_trending():
     try:
-        import requests
+        http = _feed_session()
 
         url = "https://api.github.com/search/repositories?q=AI+stars:>2000&sort=stars&order=desc&per_page=5"
-        r = requests.get(url, timeout=5)
+        r = http.get(url, timeout=5)
 
         if r.status_code != 200:
             return []
@@ -185,179 +229,691 @@ Examples:
 """
 
 
+# Compact prompt for quick one-liners (alerts); ~5x fewer prefill tokens
+MEMO_PERSONALITY_QUICK = """<SYSTEM>
+You are MEMO, a smart desktop assistant robot. Reply in under 15 words: direct, casual, no filler, no greetings. Only output the final answer.
+</SYSTEM>
+
+Context:
+{context}
+"""
+
+# Templates split once around {context}; prompts are joined from these pieces.
+# The full prompt (with examples) is used for every non-quick response type.
+_PROMPT_PARTS = {
+    'quick': tuple(MEMO_PERSONALITY_QUICK.split("{context}")),
+}
+_PROMPT_PARTS_FULL = tuple(MEMO_PERSONALITY.split("{context}"))
+
+# Hour boundaries -> period: [0,5) night, [5,12) morning, [12,17) afternoon, [17,21) evening
+_TIME_BOUNDS = (5, 12, 17, 21)
+_TIME_NAMES = ("night", "morning", "afternoon", "evening", "night")
+
+def _time_period(hour: int) -> str:
+    return _TIME_NAMES[bisect.bisect_right(_TIME_BOUNDS, hour)]
+
+
+# Keyword routing: one compiled alternation per category (substring match)
+_NEWS_RE = re.compile("|".join(map(re.escape, (
+    "mino news", "buzz", "what's buzz", "whats buzz",
+    "what's new", "whats new", "updates", "memo news",
+))))
+# Calculator: characters a pure arithmetic prompt may contain, and the AST it may use
+_MATH_DROP = str.maketrans('', '', '0123456789+-*/(). ')
+_CALC_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.USub, ast.UAdd,
+)
+
+def _safe_calc(expr: str):
+    """Evaluate +-*/ arithmetic only; raises ValueError on anything else."""
+    tree = ast.parse(expr.strip(), mode='eval')
+    for node in ast.walk(tree):
+        if not isinstance(node, _CALC_NODES):
+            raise ValueError(f"unsupported expression: {type(node).__name__}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise ValueError("non-numeric constant")
+    return eval(compile(tree, '<calc>', 'eval'), {"__builtins__": {}}, {})
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+_ASK_IDENTITY_RE = re.compile(r"who are you|your name", re.IGNORECASE)
+_ASK_USER_RE = re.compile(r"who am i|my name", re.IGNORECASE)
+
+# Intent keywords, highest priority first; matched in a single pass over the prompt
+_INTENT_KEYWORDS = (
+    ("datetime", ("time", "date", "day")),
+    ("math", ("calculate", "+", "-", "*", "/")),
+    ("riddle", ("has teeth but cannot eat",)),
+)
+_INTENT_RANK = {intent: rank for rank, (intent, _) in enumerate(_INTENT_KEYWORDS)}
+_INTENT_OF = {w: intent for intent, words in _INTENT_KEYWORDS for w in words}
+_FACT_PREFIXES = ("who is", "what is")
+
+if HAS_AHOCORASICK:
+    _INTENT_AC = ahocorasick.Automaton()
+    for _word, _intent in _INTENT_OF.items():
+        _INTENT_AC.add_word(_word, _intent)
+    _INTENT_AC.make_automaton()
+    del _word, _intent
+
+    def _scan_intents(q: str):
+        for _, intent in _INTENT_AC.iter(q):
+            yield intent
+else:
+    # Longest first so a phrase is never shadowed by a keyword inside it
+    _INTENT_RE = re.compile("|".join(map(re.escape, sorted(_INTENT_OF, key=len, reverse=True))))
+
+    def _scan_intents(q: str):
+        for m in _INTENT_RE.finditer(q):
+            yield _INTENT_OF[m.group()]
+
+_FALLBACK_RESPONSES = (
+    "Ooh, good question! My brain's a bit foggy right now though. ☁️",
+    "I'm not exactly sure, but I'm vibes-only right now! 😎",
+    "Total mystery to me! Let's just vibe instead. 🤙",
+    "I'd look that up for you, but I'm currently in 'chill mode'. 😌",
+    "Interesting... I'll have to think about that one! 🤔",
+    "You always have the most interesting questions! I'm stumped though. 😄",
+)
+
+_GEMINI_GENERATION_CONFIG = {
+    'temperature': 0.7,
+    'max_output_tokens': 50,
+    'stop_sequences': ["User:", "System:", "\n\n"]
+}
+
+# Prompt labels the local model sometimes echoes at the start of a reply
+_LEAD_LABELS = ("[MEMO]:", "MEMO:", "[User]:", "[MEMO]")
+_LABEL_WINDOW = max(map(len, _LEAD_LABELS)) + 1
+
+
+# One anchored pass strips any run of echoed labels, whatever their order
+_LEAD_LABEL = re.compile(r"^(?:(?:\[MEMO\]:?|MEMO:|\[User\]:)\s*)+", re.IGNORECASE)
+
+
+def _strip_labels(text: str) -> str:
+    return _LEAD_LABEL.sub("", text, count=1)
+
+
+def _clean_stream(pieces):
+    """Strip a leading prompt label and emoji from streamed local-model text."""
+    head = ""  # buffer the first few characters so a leading label can be stripped
+    for piece in pieces:
+        if head is not None:
+            head += piece
+            if len(head) < _LABEL_WINDOW:
+                continue
+            piece = _strip_labels(head.lstrip())
+            head = None
+        piece = _speech_chars(piece)
+        if piece:
+            yield piece
+    if head:
+        piece = _speech_chars(_strip_labels(head.strip()))
+        if piece:
+            yield piece
+
+
+# Non-ASCII symbols (emoji etc.); non-ASCII letters and digits are kept
+_NON_SPEECH_RE = re.compile(r"[^\w\x00-\x7f]")
+
+def _speech_chars(text: str) -> str:
+    """Emoji and Non-ASCII cleanup for smooth TTS."""
+    return _NON_SPEECH_RE.sub("", text)
+
+
+# Intents whose answers are computed locally or go stale; never cached
+_UNCACHED_INTENTS = frozenset(("datetime", "math"))
+
+# Shared worker pool so LLM round-trips never run on the UI/camera thread
+_EXEC = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memo-llm")
+
+# Gemini model candidates to try (Fastest first)
+_GEMINI_CANDIDATES = tuple(sys.intern(s) for s in (
+    'gemini-2.0-flash',
+    'models/gemini-2.0-flash',
+    'gemini-1.5-flash',
+    'models/gemini-1.5-flash',
+    'gemini-1.5-pro',
+))
+
+def _model_id(name: str) -> str:
+    """Model name without the API's optional 'models/' prefix."""
+    return name[len("models/"):] if name.startswith("models/") else name
+
+def _unique_models(names) -> List[str]:
+    """First spelling of each model, so one model is never queued twice."""
+    seen = set()
+    return [m for m in names if not (_model_id(m) in seen or seen.add(_model_id(m)))]
+
+def _rank_models(available) -> List[str]:
+    """Candidates the API lists as available, in preference order."""
+    return _unique_models(m for m in _GEMINI_CANDIDATES if m in available or f"models/{m}" in available)
+
+# Sampling for the local models (Ollama and llama.cpp)
+_OLLAMA_OPTIONS = {
+    "temperature": 0.25,     # keeps witty but not crazy
+    "num_predict": 120,       # HARD length limit
+    "top_p": 0.8,
+    "repeat_penalty": 1.1,
+    "stop": [
+        "[User]:",
+        "[MEMO]:",
+        "example",
+        "Example",
+        "Sure",
+        "sure"
+    ]
+}
+
+# Post-filter for the stop list, for when the backend overruns a stop sequence
+_STOP_RE = re.compile("|".join(map(re.escape, _OLLAMA_OPTIONS["stop"])))
+
+
+def _cut_at_stop(text: str) -> str:
+    m = _STOP_RE.search(text)
+    return text[:m.start()].rstrip() if m else text
+
+
+# Gemini context caching: smallest system prompt worth caching (the API
+# refuses smaller ones), and the wait after a transient cache-create failure
+GEMINI_CACHE_MIN_TOKENS = 1024
+GEMINI_CACHE_RETRY = 300.0  # seconds
+_CACHE_REFUSED_RE = re.compile(r"too small|min_total_token_count|not supported|unsupported", re.IGNORECASE)
+
+# Keep the Ollama model resident between requests (-1 = never unload)
+OLLAMA_KEEP_ALIVE = -1
+
+# Last working backend, reused on warm boot so startup skips the probe calls
+BACKEND_CACHE_PATH = Path("~/.cache/memo/backend.json").expanduser()
+BACKEND_CACHE_TTL = 3600.0  # seconds
+
+
+# =========================
+# Playful pre-built responses
+# =========================
+
+# Module RNG; seed it (_rng.seed(n)) for reproducible replies in tests
+_rng = random.Random()
+
+_GREETINGS_BY_TIME = {
+    'morning': ("Mornin'! ☀️ Let's vibe.",),
+    'afternoon': ("Yo! Chill afternoon vibes. 🌤️",),
+    'evening': ("Evening! What's good? 🌆",),
+    'night': ("Night owl crew represent! 🦉",),
+}
+
+_FOCUS_ON = (
+    "Focus mode! Phone goes brrr... into your pocket! 📱🚫",
+    "Alright, locking in! I'll be your phone police 👮",
+    "Focus time! Don't worry, I got your back!",
+    "Entering the zone! No distractions allowed!",
+    "Focus mode activated! Let's do this thing! 💪",
+)
+
+_FOCUS_OFF = (
+    "Chill mode! Scroll away my friend 📱",
+    "Focus off! You're free! 🦅",
+    "Okay okay, I'll stop being the phone police 😄",
+    "Freedom! Do whatever you want!",
+    "Break time! You earned it!",
+)
+
+_PHONE_ALERTS = (
+    "Phone! Alert! Put it down! 📱😱",
+    "Excuse me, is that a PHONE I see?! 👀",
+    "Bruh, the phone can wait! 😤",
+    "Phone spotted! The memes will still be there later!",
+    "Hey! Focus time, not TikTok time! 📱❌",
+    "Your phone misses you but I miss your attention more! 😢",
+)
+
+_POSTURE_SITTING = (
+    "Stretch break? Your back is begging! 🙏",
+    "Hey! Stand up and wiggle a bit! 💃",
+    "Your spine called, it wants a break!",
+    "Time to stand! Even I need to stretch... wait, I'm software 🤖",
+    "Move it move it! Quick stretch! 🏃",
+)
+
+_POSTURE_STANDING = (
+    "Legs tired? Take a seat, champ! 🪑",
+    "You can sit down! Standing contest is over 😄",
+    "Rest those legs! You've been a good human!",
+    "Sit sit sit! Chair misses you!",
+)
+
+_PROXIMITY = (
+    "Whoa there! Too close! Step back! 👀",
+    "Your face is gonna merge with the screen! Back up!",
+    "Easy on the eyes! Move back a bit! 👓",
+    "Screen's not going anywhere! Scoot back!",
+    "Personal space! For you AND the screen! 😄",
+)
+
+# Formatted with name= only after one is chosen
+_GOODBYE_TEMPLATES = (
+    "Later {name}! ✌️",
+    "Bye {name}! Don't be a stranger!",
+    "Peace out! Catch ya later! 🤙",
+    "See ya, {name}! Stay awesome!",
+    "Byeee! Come back soon! 👋",
+    "Later gator! Take care, {name}!",
+)
+
+_READY = (
+    "All set! What's the vibe today? 😎",
+    "Ready when you are! Let's hang!",
+    "I'm here! What's on your mind?",
+    "Ayy, I'm ready! What we doing?",
+    "Systems go! What's up? 🚀",
+)
+
+
+def _shuffled_cycle(seq):
+    """Endless shuffled passes over `seq`, with no repeat across pass boundaries."""
+    pool = list(seq)
+    last = None
+    while True:
+        _rng.shuffle(pool)
+        if len(pool) > 1 and pool[0] == last:
+            pool[0], pool[-1] = pool[-1], pool[0]
+        yield from pool
+        last = pool[-1]
+
+
 class Conversation:
     """Manages conversation history."""
     
     def __init__(self, max_history: int = 20):
-        self.history: List[Dict[str, str]] = []
+        # Bounded deque: appends evict the oldest turn in O(1)
+        self.history: Deque[Dict[str, str]] = deque(maxlen=max_history)
         self.max_history = max_history
+        self._lock = threading.Lock()  # generate() may run on pool workers
     
     def add(self, role: str, content: str):
-        self.history.append({"role": role, "content": content})
-        if len(self.history) > self.max_history:
-            self.history.pop(0)
+        with self._lock:
+            self.history.append({"role": role, "content": content})
     
     def get_history(self) -> List[Dict[str, str]]:
-        return self.history.copy()
+        with self._lock:
+            return list(self.history)
+    
+    def tail(self, n: int) -> List[Dict[str, str]]:
+        """Last `n` turns without copying the whole history first."""
+        with self._lock:
+            return list(islice(self.history, max(len(self.history) - n, 0), None))
     
     def clear(self):
-        self.history = []
+        with self._lock:
+            self.history.clear()
 
 
 class AIPersonality:
     """
     AI-powered personality for MEMO - Fun companion style.
     """
+
+    # Seconds a duplicate caller waits for the in-flight answer (matches Ollama timeout)
+    INFLIGHT_WAIT = 90.0
+    # Detectors fire at frame rate; repeat alerts inside this window are dropped
+    ALERT_COOLDOWN = 5.0
+    # An identical prompt answered this recently reuses the previous reply
+    PROMPT_DEBOUNCE = 2.0
     
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         config = config or {}
         
-        self.backend = config.get('backend', 'gemini')
+        # Interned so backend comparisons and dispatch lookups hit pointer equality
+        self.backend = sys.intern(config.get('backend', 'gemini'))
         self.gemini_key = config.get('gemini_api_key') or os.environ.get('GEMINI_API_KEY')
         self.ollama_model = config.get('ollama_model', 'phi3:mini')
         self.ollama_url = config.get('ollama_url', 'http://localhost:11434')
+        # Handle config inconsistencies (some users put full path in URL)
+        self._ollama_base = self.ollama_url.replace("/api/generate", "").replace("/api/chat", "").rstrip("/")
+        # In-process llama.cpp (backend 'llama_cpp'): path to a GGUF model, e.g. Q4_K_M
+        self.llama_gguf = config.get('llama_gguf')
+        self.llama_ctx = config.get('llama_ctx', 1024)
+        # Concurrent backend calls allowed (Ollama also needs OLLAMA_NUM_PARALLEL >= this)
+        self.max_parallel = max(1, int(config.get('max_parallel', 1)))
+        self._llama = None
+
+        self._session = None
+        self._genai = None
         
         self.user_name = config.get('user_name', 'buddy')
         self.conversation = Conversation()
         
         self._gemini_model = None
         self._gemini_client = None
-        self._generate_lock = threading.Lock()
+        self._model_queue: List[str] = []  # next Gemini models to try on a 404
+        self._gemini_caches: Dict[tuple, tuple] = {}  # (model, system) -> (cache name, renew at)
+        self._gemini_cache_retry_at = 0.0  # monotonic; inf once the API refuses caching
+        self._generate_lock = threading.Lock()  # widened by _bind_dispatch() if parallel
+        self._inflight: Dict[tuple, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._queued: Optional[Future] = None  # latest submit() not yet known to be running
+        self._queued_lock = threading.Lock()
+        self._recent: Dict[tuple, tuple] = {}  # key -> (monotonic time, reply)
+        self._last_alert = {'phone': 0.0, 'posture': 0.0, 'proximity': 0.0}
+        # Canned lines rotate through shuffled passes instead of independent picks
+        self._lines = {
+            'fallback': _shuffled_cycle(_FALLBACK_RESPONSES),
+            'focus_on': _shuffled_cycle(_FOCUS_ON),
+            'focus_off': _shuffled_cycle(_FOCUS_OFF),
+            'phone': _shuffled_cycle(_PHONE_ALERTS),
+            'sitting': _shuffled_cycle(_POSTURE_SITTING),
+            'standing': _shuffled_cycle(_POSTURE_STANDING),
+            'proximity': _shuffled_cycle(_PROXIMITY),
+            'goodbye': _shuffled_cycle(_GOODBYE_TEMPLATES),
+            'ready': _shuffled_cycle(_READY),
+        }
+        for period, lines in _GREETINGS_BY_TIME.items():
+            self._lines[period] = _shuffled_cycle(lines)
+        self._lines_lock = threading.Lock()  # generators can't be advanced concurrently
+        self._cache = ResponseCache(capacity=512)
+        # Embedding fallback for intents the keyword scan misses (no-op without the model)
+        self._router = IntentRouter(config.get('intent_model', INTENT_MODEL_DIR))
+        self._time_ctx_cache = (-1, "")  # (monotonic minute, time period)
+        self._ctx_cache = (None, "")  # (key, context); one tuple so readers see a matching pair
+        self._sys_prompts: Dict[tuple, str] = {}  # (response_type, context) -> prompt
+        self._tls = threading.local()
+        self._fell_back = False  # Set when a backend call degraded to a canned reply
+        self._cache.load()
         self._init_backend()
+        self._bind_dispatch()
         
-        print(f"[AI] ✓ Personality initialized with {self.backend} backend")
+        log.info("✓ Personality initialized with %s backend", self.backend)
 
-    def detect_intent(self, q):
-        q = q.lower()
-
-        if any(x in q for x in ["time", "date", "day"]):
-            return "datetime"
-
-        if any(x in q for x in ["calculate", "+", "-", "*", "/"]):
-            return "math"
-
-        if "has teeth but cannot eat" in q:
-            return "riddle"
+    def detect_intent(self, q_lower: str) -> str:
+        """Classify an already-lowercased, stripped prompt (callers lower it once)."""
+        best = None
+        for intent in _scan_intents(q_lower):
+            if intent == "datetime":
+                return intent
+            if best is None or _INTENT_RANK[intent] < _INTENT_RANK[best]:
+                best = intent
+        if best is not None:
+            return best
 
-        if q.startswith("who is") or q.startswith("what is"):
+        if q_lower.startswith(_FACT_PREFIXES):
             return "fact"
 
-        return "chat"
+        return self._router.classify(q_lower) or "chat"
 
     def _init_backend(self):
-        """Initialize the AI backend with a robust model search and fallback."""
+        """Initialize the AI backend, reusing a recent choice from disk if possible."""
         self._gemini_client = None
         self.active_model = 'gemini-1.5-flash' # Default
-        
+        config_key = self._backend_config_key()
+
+        if self._restore_backend(config_key):
+            log.info("✓ Brain: %s (%s) restored from cache.", self.backend,
+                     self.ollama_model if self.backend == 'ollama' else self.active_model)
+        else:
+            self._select_backend()
+            # llama.cpp loads in-process (nothing to restore), and a fallback from a
+            # failed load must not outlive a fix to the model path or install
+            if self.backend != 'fallback' and config_key['configured'] != 'llama_cpp':
+                self._save_backend(config_key)
+
+        if self.backend == 'ollama':
+            # Warm the model in the background so the first reply skips the load.
+            # Own thread: the request can block for minutes, and on _EXEC it
+            # would hold one of the two workers generate_async() relies on
+            threading.Thread(target=self._preload_ollama, name="memo-ollama-preload",
+                             daemon=True).start()
+
+    def _preload_ollama(self):
+        """Ask Ollama to load the model now and keep it resident."""
+        try:
+            self._http.post(
+                f"{self._ollama_base}/api/generate",
+                json={"model": self.ollama_model, "keep_alive": OLLAMA_KEEP_ALIVE},
+                timeout=120
+            )
+            log.debug("Ollama model %s preloaded.", self.ollama_model)
+        except Exception as e:
+            log.debug("Ollama preload failed: %s", e)
+
+    def _backend_config_key(self) -> Dict[str, Any]:
+        """The configuration a cached backend choice is only valid for."""
+        return {
+            'configured': self.backend,
+            'ollama_base': self._ollama_base,
+            'ollama_model': self.ollama_model,
+            # Hashed so the key itself never lands on disk
+            'gemini_key': hashlib.sha256(self.gemini_key.encode()).hexdigest()
+                          if self.gemini_key else None,
+            'llama_gguf': self.llama_gguf,
+        }
+
+    def _restore_backend(self, config_key: Dict[str, Any]) -> bool:
+        """Rebuild the backend recorded by _save_backend() without any network probe."""
+        try:
+            if time.time() - BACKEND_CACHE_PATH.stat().st_mtime > BACKEND_CACHE_TTL:
+                return False
+            cached = json.loads(BACKEND_CACHE_PATH.read_text())
+        except (OSError, ValueError):
+            return False
+
+        # Only valid for the same configuration it was recorded under
+        if cached.get('config') != config_key:
+            return False
+
+        backend = cached.get('backend')
+        try:
+            if backend == 'gemini_new' and self.gemini_key:
+                genai = _get_genai_new()
+                self._gemini_client = genai.Client(api_key=self.gemini_key)
+                self.active_model = cached['model']
+            elif backend == 'gemini' and self.gemini_key:
+                genai = _get_genai_legacy()
+                genai.configure(api_key=self.gemini_key)
+                self._gemini_model = genai.GenerativeModel(cached['model'])
+                self._genai = genai
+                self.active_model = cached['model']
+            elif backend == 'ollama':
+                self.ollama_model = cached['ollama_model']
+            else:
+                return False
+            if backend != 'ollama':
+                # Unverified list; a 404 on first use walks the usual candidates
+                self._model_queue = [m for m in _unique_models(_GEMINI_CANDIDATES)
+                                     if _model_id(m) != _model_id(self.active_model)]
+        except Exception as e:
+            log.debug("Backend cache ignored: %s", e)
+            self._gemini_client = None
+            self._gemini_model = None
+            return False
+
+        self.backend = sys.intern(backend)
+        return True
+
+    def _save_backend(self, config_key: Dict[str, Any]):
+        """Atomically record the selected backend for the next start."""
+        data = {
+            'config': config_key,
+            'backend': self.backend,
+            'model': self.active_model,
+            'ollama_model': self.ollama_model,
+        }
+        try:
+            BACKEND_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            tmp = BACKEND_CACHE_PATH.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data))
+            os.replace(tmp, BACKEND_CACHE_PATH)
+        except OSError as e:
+            log.debug("Could not write backend cache: %s", e)
+
+    def _select_backend(self):
+        """Pick a working backend with a robust model search and fallback."""
+        # In-process llama.cpp: no HTTP/IPC, and the prompt-prefix KV cache stays warm
+        if self.backend == 'llama_cpp' and self.llama_gguf:
+            try:
+                from llama_cpp import Llama
+                self._llama = Llama(
+                    model_path=self.llama_gguf,
+                    n_ctx=self.llama_ctx,
+                    n_threads=os.cpu_count() or 4,
+                    n_batch=64,
+                    use_mlock=True,
+                    verbose=False
+                )
+                log.info("✓ Brain: llama.cpp (%s) loaded.", os.path.basename(self.llama_gguf))
+                return
+            except ImportError:
+                log.info("Note: 'llama-cpp-python' not installed. Trying Ollama.")
+            except Exception as e:
+                log.info("llama.cpp init failed: %s", e)
+
         # Try Gemini
         if self.backend == 'gemini' and self.gemini_key:
-            print(f"[AI] Initializing Gemini...")
+            log.info("Initializing Gemini...")
             
             # 1. Try New Google GenAI SDK
             try:
-                from google import genai
+                genai = _get_genai_new()
                 client = genai.Client(api_key=self.gemini_key)
                 
-                # Model candidates to try (Fastest first)
-                candidates = [
-                    'gemini-2.0-flash', 
-                    'models/gemini-2.0-flash', 
-                    'gemini-1.5-flash', 
-                    'models/gemini-1.5-flash',
-                    'gemini-1.5-pro'
-                ]
-                last_error = None
-                
-                for model_name in candidates:
-                    try:
-                        client.models.generate_content(model=model_name, contents='Start')
-                        # If successful:
-                        self._gemini_client = client
-                        self.active_model = model_name
-                        self.backend = 'gemini_new'
-                        print(f"[AI] ✓ Brain: Gemini ({model_name}) connected.")
-                        return
-                    except Exception as e:
-                        print(f"[AI] Debug: {model_name} failed: {e}")
-                        last_error = e
-                        continue
+                # Listing models is free; the first real generate() validates the pick
+                ranked = _rank_models({m.name for m in client.models.list()})
+                if ranked:
+                    self._gemini_client = client
+                    self.active_model = ranked[0]
+                    self._model_queue = ranked[1:]
+                    self.backend = 'gemini_new'
+                    log.info("✓ Brain: Gemini (%s) connected.", self.active_model)
+                    return
                 
-                print(f"[AI] New SDK installed but no working model found. Last error: {last_error}")
+                log.info("New SDK installed but none of the candidate models are available.")
                 
             except ImportError:
-                print("[AI] Note: 'google-genai' package not installed. Skipping new SDK.")
+                log.info("Note: 'google-genai' package not installed. Skipping new SDK.")
             except Exception as e:
-                print(f"[AI] New SDK Init failed: {e}")
+                log.info("New SDK Init failed: %s", e)
 
             # 2. Try Legacy SDK
             try:
-                import google.generativeai as genai
+                genai = _get_genai_legacy()
                 genai.configure(api_key=self.gemini_key)
-                # Prioritize gemini-1.5-flash
-                model = genai.GenerativeModel('gemini-1.5-flash')
-                model.generate_content("Start")
-                self._gemini_model = model
-                self.backend = 'gemini'
-                print("[AI] ✓ Brain: Gemini (Legacy SDK) connected.")
-                return
+                ranked = _rank_models({m.name for m in genai.list_models()})
+                if ranked:
+                    self._genai = genai
+                    self._gemini_model = genai.GenerativeModel(ranked[0])
+                    self.active_model = ranked[0]
+                    self._model_queue = ranked[1:]
+                    self.backend = 'gemini'
+                    log.info("✓ Brain: Gemini (Legacy SDK, %s) connected.", self.active_model)
+                    return
+                log.info("Legacy SDK: none of the candidate models are available.")
             except Exception as e:
-                print(f"[AI] Legacy SDK Init failed: {e}")
+                log.info("Legacy SDK Init failed: %s", e)
         
         # Fallback: Try Ollama
         try:
-            import requests
-            # Handle config inconsistencies (some users put full path in URL)
-            base_url = self.ollama_url.replace("/api/generate", "").rstrip("/")
-            
-            resp = requests.get(f"{base_url}/api/tags", timeout=5)
+            resp = self._http.get(f"{self._ollama_base}/api/tags", timeout=5)
             if resp.status_code == 200:
                 # Check if our configured model exists, or pick one from the list
                 models = [m['name'] for m in resp.json().get('models', [])]
                 if self.ollama_model in models:
                     self.backend = 'ollama'
-                    print(f"[AI] ✓ Brain: Ollama ({self.ollama_model}) connected.")
+                    log.info("✓ Brain: Ollama (%s) connected.", self.ollama_model)
                     return
                 elif models:
                     self.ollama_model = models[0]
                     self.backend = 'ollama'
-                    print(f"[AI] ✓ Brain: Ollama (using {self.ollama_model}) connected.")
+                    log.info("✓ Brain: Ollama (using %s) connected.", self.ollama_model)
                     return
         except:
             pass
         
         self.backend = 'fallback'
-        print("[AI] Brain: Local Fallback activated (No LLM).")
+        log.info("Brain: Local Fallback activated (No LLM).")
     
-    def _get_time_context(self) -> str:
-        hour = datetime.now().hour
-        if 5 <= hour < 12:
-            return "morning"
-        elif 12 <= hour < 17:
-            return "afternoon"
-        elif 17 <= hour < 21:
-            return "evening"
+    @property
+    def _http(self):
+        """Persistent keep-alive session for Ollama (created on first use)."""
+        if self._session is None:
+            requests = _get_requests()
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1, pool_maxsize=max(4, self.max_parallel), max_retries=0
+            )
+            session.mount('http://', adapter)
+            session.headers.update({'Connection': 'keep-alive'})
+            self._session = session
+        return self._session
+
+    @property
+    def _fell_back(self) -> bool:
+        # Per thread, so concurrent backend calls don't clobber each other's flag
+        return getattr(self._tls, 'fell_back', False)
+
+    @_fell_back.setter
+    def _fell_back(self, value: bool):
+        self._tls.fell_back = value
+
+    def _bind_dispatch(self):
+        """Resolve the generator for the active backend (call after any backend change)."""
+        # Remote backends can serve several prompts at once; llama.cpp in-process cannot
+        if self.max_parallel > 1 and self.backend in ('ollama', 'gemini_new', 'gemini'):
+            self._generate_lock = threading.BoundedSemaphore(self.max_parallel)
         else:
-            return "night"
+            self._generate_lock = threading.Lock()
+        self._dispatch = {
+            'gemini_new': self._generate_gemini_new,
+            'gemini': self._generate_gemini,
+            'ollama': self._generate_ollama,
+            'llama_cpp': self._generate_llama_cpp,
+        }.get(self.backend, self._generate_fallback)
+        self._dispatch_stream = {
+            'gemini_new': self._stream_gemini_new,
+            'gemini': self._stream_gemini,
+            'ollama': self._stream_ollama,
+            'llama_cpp': self._stream_llama_cpp,
+        }.get(self.backend, self._stream_fallback)
+
+    def _get_time_context(self) -> str:
+        # The period changes a few times a day; re-read the clock once a minute
+        bucket = int(time.monotonic() // 60)
+        cached_bucket, period = self._time_ctx_cache
+        if bucket != cached_bucket:
+            period = _time_period(datetime.now().hour)
+            self._time_ctx_cache = (bucket, period)
+        return period
     
     def _build_context(self, scene_state=None) -> str:
-        parts = []
         time_period = self._get_time_context()
-        parts.append(f"Time: {time_period}")
-        
         if scene_state:
             identity = scene_state.human.get('identity')
-            if identity:
-                self.user_name = identity
-                parts.append(f"User: {identity}")
-            
             pose = scene_state.human.get('pose_state')
-            if pose and pose != 'unknown':
-                parts.append(f"User is: {pose}")
-            
-            if scene_state.focus_mode:
-                parts.append("Focus mode: ON")
-        
-        return "\n".join(parts)
+            focus = scene_state.focus_mode
+        else:
+            identity = pose = None
+            focus = False
+
+        if identity:
+            self.user_name = identity
+
+        # Context only changes when one of its inputs does
+        key = (time_period, identity, pose, focus)
+        cached_key, cached_val = self._ctx_cache
+        if key == cached_key:
+            return cached_val
+
+        parts = [f"Time: {time_period}"]
+        if identity:
+            parts.append(f"User: {identity}")
+        if pose and pose != 'unknown':
+            parts.append(f"User is: {pose}")
+        if focus:
+            parts.append("Focus mode: ON")
+
+        context = "\n".join(parts)
+        self._ctx_cache = (key, context)
+        return context
     
     def get_personalized_updates(self):
         profile = load_profile()
@@ -382,217 +938,541 @@ class AIPersonality:
 
         # 4. Cleanup & Random Selection to keep it fresh
         # We want a mix, not just the first 15 of one category
-        random.shuffle(updates)
+        _rng.shuffle(updates)
         return updates[:12]
 
 
         
     def generate(self, prompt: str, scene_state=None, response_type: str = "quick") -> str:
-        """Generate an AI response (Thread-safe and throttled)."""
+        """
+        Generate an AI response (Thread-safe and throttled).
+
+        Identical prompts that arrive while one is already being answered
+        share that single backend call instead of being turned away.
+        """
+        key = (response_type, prompt.lower().strip())
+        with self._inflight_lock:
+            recent = self._recent.get(key)
+            if recent is not None and time.monotonic() - recent[0] < self.PROMPT_DEBOUNCE:
+                return recent[1]
+            pending = self._inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._inflight[key] = Future()
+
+        if not owner:
+            try:
+                return pending.result(timeout=self.INFLIGHT_WAIT)
+            except Exception:
+                return "Just a sec, thinking..."
+
+        try:
+            self._fell_back = False
+            response = self._generate(prompt, scene_state, response_type)
+            pending.set_result(response)
+            # Debounce only real answers; a throttle or fallback line would
+            # otherwise be replayed for the whole window
+            if not self._fell_back:
+                with self._inflight_lock:
+                    self._recent[key] = (time.monotonic(), response)
+                    if len(self._recent) > 64:
+                        self._prune_recent()
+            return response
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def _prune_recent(self):
+        """Drop debounce entries that have aged out (caller holds _inflight_lock)."""
+        cutoff = time.monotonic() - self.PROMPT_DEBOUNCE
+        for k in [k for k, (t, _) in self._recent.items() if t < cutoff]:
+            del self._recent[k]
+
+    def _route(self, prompt: str):
+        """(lowercased prompt, intent), computed once per request; intent is None for news."""
+        prompt_lower = prompt.lower().strip()
+        if _NEWS_RE.search(prompt_lower):
+            return prompt_lower, None
+        return prompt_lower, self.detect_intent(prompt_lower)
+
+    def _cache_lookup(self, prompt: str, scene_state, response_type: str, intent: Optional[str]) -> Optional[str]:
+        """Answer from the response cache without taking the backend lock."""
+        if intent is None or intent in _UNCACHED_INTENTS:
+            return None
+        cached = self._cache.get(self._build_context(scene_state), prompt, response_type)
+        if cached is not None:
+            self.conversation.add("user", prompt)
+            self.conversation.add("assistant", cached)
+        return cached
+
+    def _generate(self, prompt: str, scene_state, response_type: str) -> str:
+        route = self._route(prompt)
+        cached = self._cache_lookup(prompt, scene_state, response_type, route[1])
+        if cached is not None:
+            return cached
         # PREVENTION: Don't overload the Pi with multiple LLM calls
         if not self._generate_lock.acquire(blocking=False):
+            self._fell_back = True
             return "Just a sec, thinking..."
-            
         try:
-            # Local overrides for speed
-            prompt_lower = prompt.lower().strip()
-
-            NEWS_TRIGGERS = [
-                "mino news",
-                "buzz",
-                "what's buzz",
-                "whats buzz",
-                "what's new",
-                "whats new",
-                "updates",
-                "memo news"
-            ]
-            if any(t in prompt_lower for t in NEWS_TRIGGERS):
-                updates = self.get_personalized_updates()
-
-                if not updates:
-                    return "Nothing big yet, but I'm watching."
-
-                # Create a rich prompt for the anchor persona
-                joined_updates = "\n".join(updates)
-                summary_prompt = (
-                    "You are a tech news anchor. Summarize these raw items into a brisk, exciting 3-sentence spoken update.\n"
-                    "Include:\n"
-                    "1. One major tech launch or AI news.\n"
-                    "2. One trending tool or repo.\n"
-                    "3. One career/internship opportunity if listed.\n\n"
-                    "Rules:\n"
-                    "- Answer in ONE paragraph, not a list.\n"
-                    "- No URLs, no code syntax, no markdown.\n"
-                    "- Do NOT cut off sentences.\n"
-                    "- Keep it under 50 words.\n\n"
-                    f"Raw Data:\n{joined_updates}"
-                )
-                
-                # Generate and then sanitize
-                raw_response = self._generate_ollama(summary_prompt)
-                return self._sanitize_for_speech(raw_response)
+            return "".join(self._respond(prompt, scene_state, response_type, route, stream=False))
+        finally:
+            self._generate_lock.release()
 
+    def generate_stream(self, prompt: str, scene_state=None, response_type: str = "quick"):
+        """
+        Yield the reply in chunks as the backend produces them.
+
+        Lets TTS/avatar start speaking on the first tokens; generate() is the
+        same pipeline joined into one string.
+        """
+        route = self._route(prompt)
+        cached = self._cache_lookup(prompt, scene_state, response_type, route[1])
+        if cached is not None:
+            yield cached
+            return
+        if not self._generate_lock.acquire(blocking=False):
+            yield "Just a sec, thinking..."
+            return
+        try:
+            yield from self._respond(prompt, scene_state, response_type, route, stream=True)
+        finally:
+            self._generate_lock.release()
+
+    def generate_sentences(self, prompt: str, scene_state=None, response_type: str = "quick"):
+        """
+        Yield the reply one complete sentence at a time.
+
+        Sentence-sized pieces can be queued on TTS as they finish, so speech
+        starts after the first sentence rather than the whole reply.
+        """
+        buf = ""
+        for chunk in self.generate_stream(prompt, scene_state, response_type):
+            buf += chunk
+            *done, buf = _SENTENCE_END_RE.split(buf)
+            for sentence in done:
+                if sentence.strip():
+                    yield sentence.strip()
+        if buf.strip():
+            yield buf.strip()
+
+    def _respond(self, prompt: str, scene_state, response_type: str, route, stream: bool):
+        """Shared generate pipeline; yields one chunk, or many when streaming."""
+        # Bind hot-path attributes to locals once per call
+        _build_context = self._build_context
+        _add = self.conversation.add
+
+        # Lowercased prompt and intent from _route(), shared with the cache lookup
+        prompt_lower, intent = route
+
+        if intent is None:  # News request
+            updates = self.get_personalized_updates()
+
+            if not updates:
+                yield "Nothing big yet, but I'm watching."
+                return
+
+            # Create a rich prompt for the anchor persona
+            joined_updates = "\n".join(updates)
+            summary_prompt = (
+                "You are a tech news anchor. Summarize these raw items into a brisk, exciting 3-sentence spoken update.\n"
+                "Include:\n"
+                "1. One major tech launch or AI news.\n"
+                "2. One trending tool or repo.\n"
+                "3. One career/internship opportunity if listed.\n\n"
+                "Rules:\n"
+                "- Answer in ONE paragraph, not a list.\n"
+                "- No URLs, no code syntax, no markdown.\n"
+                "- Do NOT cut off sentences.\n"
+                "- Keep it under 50 words.\n\n"
+                f"Raw Data:\n{joined_updates}"
+            )
             
-            # Intent Detection Integration
-            intent = self.detect_intent(prompt_lower)
-            
-            if intent == "datetime":
-                 return datetime.now().strftime("%A, %B %d %Y at %I:%M %p")
-            
-            if intent == "math":
+            # Generate and then sanitize
+            raw_response = self._generate_ollama(summary_prompt)
+            yield self._sanitize_for_speech(raw_response)
+            return
+
+        
+        if intent == "datetime":
+            yield datetime.now().strftime("%A, %B %d %Y at %I:%M %p")
+            return
+        
+        if intent == "math":
+            result = None
+            expr = prompt_lower.replace("calculate", "", 1)
+            if not expr.translate(_MATH_DROP):
                 try:
-                    # Basic safe eval for calculator
-                    allowed = set("0123456789+-*/(). ")
-                    if set(prompt.replace("calculate", "")).issubset(allowed):
-                        return str(eval(prompt.replace("calculate","")))
-                except:
+                    result = str(_safe_calc(expr))
+                except (SyntaxError, ValueError, ArithmeticError):
                     pass # Fallback to LLM if math fails
+            if result is not None:
+                yield result
+                return
 
 
-            context = self._build_context(scene_state)
-            system_prompt = MEMO_PERSONALITY.format(context=context)
-            
+        # Cache hits were already served by _cache_lookup() before the lock
+        context = _build_context(scene_state)
+
+        # Fact questions get the compact, answer-only prompt
+        system_prompt = self._system_prompt(context, "quick" if intent == "fact" else response_type)
+
+        if self.backend in ('ollama', 'llama_cpp'):
             # Extract lightweight history (Last 6 turns)
-            history_str = ""
-            for h in self.conversation.get_history()[-6:]:
-                role = "Q" if h['role'] == "user" else "A"
-                history_str += f"{role}: {h['content']}\n"
-            
-            if self.backend == 'gemini_new' and self._gemini_client:
-                full_prompt = f"{system_prompt}\n\nQ: {prompt}\nA:"
-                response = self._generate_gemini_new(full_prompt)
-            elif self.backend == 'gemini' and self._gemini_model:
-                full_prompt = f"{system_prompt}\n\nQ: {prompt}\nA:"
-                response = self._generate_gemini(full_prompt)
-            elif self.backend == 'ollama':
-                # V5.5: Bracketed labels are safer from accidental stops
-                full_prompt = f"{system_prompt}\n{history_str}[User]: {prompt}\n[MEMO]: "
-                response = self._generate_ollama(full_prompt)
-            else:
-                response = self._generate_fallback(prompt)
-            
-            self.conversation.add("user", prompt)
-            self.conversation.add("assistant", response)
-            return response
-            
-        finally:
-            self._generate_lock.release()
-    
-    def _generate_gemini_new(self, prompt: str) -> str:
+            history_str = "".join(
+                f"{'Q' if h['role'] == 'user' else 'A'}: {h['content']}\n"
+                for h in self.conversation.tail(6)
+            )
+            # V5.5: Bracketed labels are safer from accidental stops
+            turn = "".join((history_str, "[User]: ", prompt, "\n[MEMO]: "))
+        elif self.backend in ('gemini_new', 'gemini'):
+            turn = "".join(("Q: ", prompt, "\nA:"))
+        else:
+            turn = prompt
+            system_prompt = ""
+
+        # The system prompt travels separately so backends can keep it cached
+        self._fell_back = False
+        if stream:
+            chunks = []
+            for chunk in self._dispatch_stream(turn, system_prompt):
+                chunks.append(chunk)
+                yield chunk
+            # Chunks already went out as-is; store the reply cleaned like the
+            # non-streaming local backends clean theirs
+            response = self._sanitize_response(_cut_at_stop("".join(chunks).strip()), turn)
+        else:
+            response = self._dispatch(turn, system_prompt)
+
+        # Only cache real LLM answers, never errors or canned fallback lines
+        if not self._fell_back and intent not in _UNCACHED_INTENTS:
+            self._cache.put(context, prompt, response, response_type)
+
+        _add("user", prompt)
+        _add("assistant", response)
+        if not stream:
+            yield response
+
+    def _system_prompt(self, context: str, response_type: str) -> str:
+        """Personality template filled with `context`, memoized (FIFO, 32 entries)."""
+        key = (response_type, context)
+        prompt = self._sys_prompts.get(key)
+        if prompt is None:
+            prefix, suffix = _PROMPT_PARTS.get(response_type, _PROMPT_PARTS_FULL)
+            prompt = prefix + context + suffix
+            if len(self._sys_prompts) >= 32:
+                self._sys_prompts.pop(next(iter(self._sys_prompts), None), None)
+            self._sys_prompts[key] = prompt
+        return prompt
+
+    def generate_async(self, prompt: str, scene_state=None, response_type: str = "quick") -> Future:
+        """
+        Run generate() on the shared LLM worker pool and return its Future.
+
+        Callers can add_done_callback() or poll done(); call cancel() on a
+        stale request (e.g. a proximity alert after the user moved back).
+        """
+        return _EXEC.submit(self.generate, prompt, scene_state, response_type)
+
+    def submit(self, prompt: str, scene_state=None, response_type: str = "quick") -> Future:
+        """
+        Latest-wins variant of generate_async() for per-frame callers.
+
+        A request from an earlier submit() that is still waiting for a worker
+        is cancelled, so a camera/UI loop can call this on every event and
+        just poll `fut.done()` without a backlog building up.
+        """
+        with self._queued_lock:
+            if self._queued is not None:
+                self._queued.cancel()  # no-op once it has started running
+            fut = self._queued = self.generate_async(prompt, scene_state, response_type)
+        return fut
+
+    async def agenerate(
+        self,
+        prompt: str,
+        scene_state=None,
+        response_type: str = "quick",
+        timeout: Optional[float] = None
+    ) -> str:
+        """
+        Awaitable generate() for asyncio callers.
+
+        The blocking backend call runs on the shared LLM worker pool, so
+        several alerts can be in flight while the event loop stays responsive.
+        """
+        call = asyncio.wrap_future(self.generate_async(prompt, scene_state, response_type))
+        try:
+            return await asyncio.wait_for(call, timeout=timeout)
+        except asyncio.TimeoutError:
+            log.warning("generate() timed out after %ss", timeout)
+            return self._generate_fallback(prompt)
+
+    def save_cache(self):
+        """Persist the response cache to disk (call on shutdown)."""
+        self._cache.save()
+
+    def _gemini_config(self, system: str) -> Optional[Dict[str, Any]]:
+        """
+        Per-call config carrying the system prompt.
+
+        Uses a server-side context cache (10 min TTL) per system prompt when
+        it is long enough for the API to accept one; shorter prompts, and any
+        failure to create a cache, send system_instruction inline instead.
+        """
+        if not system:
+            return None
+        now = time.monotonic()
+        # Rough token count (~4 chars each): skip the doomed create() round trip
+        if len(system) // 4 >= GEMINI_CACHE_MIN_TOKENS and now >= self._gemini_cache_retry_at:
+            key = (self.active_model, system)
+            entry = self._gemini_caches.get(key)
+            if entry is None or now > entry[1]:
+                try:
+                    cache = self._gemini_client.caches.create(
+                        model=self.active_model,
+                        config={"system_instruction": system, "ttl": "600s"}
+                    )
+                    entry = (cache.name, now + 540)  # renew before the server expires it
+                    if len(self._gemini_caches) >= 8:
+                        self._gemini_caches.pop(next(iter(self._gemini_caches), None), None)
+                    self._gemini_caches[key] = entry
+                except Exception as e:
+                    log.debug("Gemini context cache unavailable: %s", e)
+                    # Refusals are permanent; anything else (5xx, timeout) is retried later
+                    permanent = _CACHE_REFUSED_RE.search(str(e)) is not None
+                    self._gemini_cache_retry_at = float('inf') if permanent else now + GEMINI_CACHE_RETRY
+                    entry = None
+            if entry is not None:
+                return {"cached_content": entry[0]}
+        return {"system_instruction": system}
+
+    def _generate_gemini_new(self, prompt: str, system: str = "") -> str:
         if not self._gemini_client:
              return self._generate_fallback(prompt)
+        model = self.active_model
         try:
              response = self._gemini_client.models.generate_content(
-                 model=self.active_model, contents=prompt
+                 model=model, contents=prompt, config=self._gemini_config(system)
              )
              return response.text.strip()
         except Exception as e:
-             print(f"[AI] Gemini New Error: {e}")
+             if self._next_gemini_model(e, model):
+                 return self._generate_gemini_new(prompt, system)
+             log.warning("Gemini New Error: %s", e)
              return self._generate_fallback(prompt)
 
-    
-    def _generate_prompt(self, prompt_text: str, context: Optional[Dict[str, Any]] = None) -> str:
-        """Create a context-aware system prompt."""
-        time_context = self._get_time_context()
-        context_str = self._format_context(context)
-        
-        system_instruction = (
-            f"You are MEMO, a witty, helpful, and concise AI companion. "
-            f"Current time: {time_context}. "
-            f"User context: {context_str}. "
-            f"RULES: 1. Be concise (1-2 sentences). 2. Be helpful. 3. STOP generating after your answer."
-        )
-
-        prompt = (
-            f"{system_instruction}\n\n"
-            f"User: {prompt_text}\n"
-            f"MEMO:"
-        )
-        return prompt
-    
-    def _generate_gemini(self, prompt: str) -> str:
+
+    def _stream_gemini_new(self, prompt: str, system: str = ""):
+        if not self._gemini_client:
+            yield self._generate_fallback(prompt)
+            return
+        started = False
+        model = self.active_model
+        try:
+            for chunk in self._gemini_client.models.generate_content_stream(
+                model=model, contents=prompt, config=self._gemini_config(system)
+            ):
+                if chunk.text:
+                    started = True
+                    yield chunk.text
+        except Exception as e:
+            if not started and self._next_gemini_model(e, model):
+                yield from self._stream_gemini_new(prompt, system)
+                return
+            log.warning("Gemini New Error: %s", e)
+            if not started:
+                yield self._generate_fallback(prompt)
+
+    def _generate_gemini(self, prompt: str, system: str = "") -> str:
         if not self._gemini_model:
             return self._generate_fallback(prompt)
         
+        model = self.active_model
         try:
             response = self._gemini_model.generate_content(
-                prompt,
-                generation_config={
-                    'temperature': 0.7,
-                    'max_output_tokens': 50,
-                    'stop_sequences': ["User:", "System:", "\n\n"]
-                }
+                f"{system}\n\n{prompt}" if system else prompt,
+                generation_config=_GEMINI_GENERATION_CONFIG
             )
             return response.text.strip()
         except Exception as e:
-            error_str = str(e)
-            if "429" in error_str:
-                print("[AI Gemini] ! Quota exceeded.")
-            elif "403" in error_str:
-                print("[AI Gemini] ! API Key error.")
-            elif "404" in error_str:
-                print("[AI Gemini] ! Model not found.")
+            if self._next_gemini_model(e, model):
+                return self._generate_gemini(prompt, system)
+            self._log_gemini_error(e)
             return self._generate_fallback(prompt)
+
+    def _stream_gemini(self, prompt: str, system: str = ""):
+        if not self._gemini_model:
+            yield self._generate_fallback(prompt)
+            return
+        started = False
+        model = self.active_model
+        try:
+            for chunk in self._gemini_model.generate_content(
+                f"{system}\n\n{prompt}" if system else prompt,
+                generation_config=_GEMINI_GENERATION_CONFIG,
+                stream=True
+            ):
+                if chunk.text:
+                    started = True
+                    yield chunk.text
+        except Exception as e:
+            if not started and self._next_gemini_model(e, model):
+                yield from self._stream_gemini(prompt, system)
+                return
+            self._log_gemini_error(e)
+            if not started:
+                yield self._generate_fallback(prompt)
+
+    def _next_gemini_model(self, error: Exception, failed: str) -> bool:
+        """On a 404 for `failed`, switch to the next listed candidate (True = retry)."""
+        if "404" not in str(error):
+            return False
+        # Parallel calls can hit the same 404; only the first one advances the queue
+        with self._inflight_lock:
+            if self.active_model != failed:
+                return True  # Already switched by another call; retry on the new model
+            if not self._model_queue:
+                return False
+            self.active_model = self._model_queue.pop(0)
+            if self._genai is not None:
+                self._gemini_model = self._genai.GenerativeModel(self.active_model)
+        log.info("Gemini model %s not found, switching to %s.", failed, self.active_model)
+        return True
+
+    @staticmethod
+    def _log_gemini_error(e: Exception):
+        error_str = str(e)
+        if "429" in error_str:
+            log.warning("Gemini: quota exceeded.")
+        elif "403" in error_str:
+            log.warning("Gemini: API key error.")
+        elif "404" in error_str:
+            log.warning("Gemini: model not found.")
     
-    def _generate_ollama(self, prompt: str) -> str:
+    def _generate_ollama(self, prompt: str, system: str = "") -> str:
         try:
-            import requests
-            from interface.dashboard import add_log
-            
             # Use /api/generate for completion style (Better for Answer Triggers)
-            base_url = self.ollama_url.replace("/api/generate", "").replace("/api/chat", "").rstrip("/")
+            base_url = self._ollama_base
             
             # V5.0: Prompt is already built in generate()
-            prompt_template = prompt
-            
-            payload = {
-                "model": self.ollama_model,
-                "prompt": prompt_template,
-                "stream": False,
-                "options": {
-                     "temperature": 0.25,     # keeps witty but not crazy
-                     "num_predict": 120,       # HARD length limit
-                     "top_p": 0.8,
-                     "repeat_penalty": 1.1,
-                     "stop": [
-                        "[User]:",
-                        "[MEMO]:",
-                        "example",
-                        "Example",
-                        "Sure",
-                        "sure"
-                     ]
-                }
-            }
+            payload = self._ollama_payload(prompt, stream=False, system=system)
             
-            add_log(f"Brain is thinking about: {prompt[:30]}...", "ai")
-            response = requests.post(f"{base_url}/api/generate", json=payload, timeout=90)
+            _post = self._http.post
+            _add_log = _get_add_log()
+
+            _add_log(f"Brain is thinking about: {prompt[:30]}...", "ai")
+            response = _post(f"{base_url}/api/generate", json=payload, timeout=90)
 
             if response.status_code == 200:
                 data = response.json()
-                text = data.get('response', '').strip()
-                # Simplified cleaning (V5.6)
-                for label in ["[MEMO]:", "MEMO:", "[User]:", "[MEMO]"]:
-                    if text.startswith(label):
-                        text = text[len(label):].strip()
-                
+                text = _cut_at_stop(_strip_labels(data.get('response', '').strip()))
                 return self._sanitize_response(text, prompt)
             else:
+                self._fell_back = True
                 return f"Brain freeze! (Error {response.status_code})"
                 
         except Exception as e:
-            print(f"[AI Error] {e}")
-            from interface.dashboard import add_log
+            log.error("Ollama error: %s", e)
+            _get_add_log()(f"AI Error: {e}", "error")
+            return self._generate_fallback(prompt)
+
+    def _ollama_payload(self, prompt: str, stream: bool, system: str = "") -> Dict[str, Any]:
+        payload = {
+            "model": self.ollama_model,
+            "prompt": prompt,
+            "stream": stream,
+            "keep_alive": OLLAMA_KEEP_ALIVE,  # each request resets the unload timer
+            "options": _OLLAMA_OPTIONS
+        }
+        if system:
+            # Identical system text every turn -> llama.cpp reuses its KV prefix
+            payload["system"] = system
+        return payload
+
+    def _stream_ollama(self, prompt: str, system: str = ""):
+        """Stream NDJSON tokens from /api/generate, cleaned for speech."""
+        add_log = _get_add_log()
+        started = False
+        try:
+            add_log(f"Brain is thinking about: {prompt[:30]}...", "ai")
+            with self._http.post(
+                f"{self._ollama_base}/api/generate",
+                json=self._ollama_payload(prompt, stream=True, system=system),
+                timeout=90,
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    self._fell_back = True
+                    yield f"Brain freeze! (Error {response.status_code})"
+                    return
+
+                for piece in _clean_stream(self._ndjson_pieces(response)):
+                    started = True
+                    yield piece
+        except Exception as e:
+            log.error("Ollama error: %s", e)
             add_log(f"AI Error: {e}", "error")
+            if not started:
+                yield self._generate_fallback(prompt)
+
+    @staticmethod
+    def _ndjson_pieces(response):
+        """Text fragments from an Ollama NDJSON stream, up to the 'done' line."""
+        for line in response.iter_lines():
+            if not line:
+                continue
+            data = json.loads(line)
+            yield data.get('response', '')
+            if data.get('done', False):
+                return
+
+    def _llama_kwargs(self) -> Dict[str, Any]:
+        # Same sampling as the Ollama payload so both local backends sound alike
+        opts = _OLLAMA_OPTIONS
+        return {
+            "max_tokens": opts["num_predict"],
+            "temperature": opts["temperature"],
+            "top_p": opts["top_p"],
+            "repeat_penalty": opts["repeat_penalty"],
+            "stop": opts["stop"],
+        }
+
+    def _generate_llama_cpp(self, prompt: str, system: str = "") -> str:
+        try:
+            # System prompt leads, so the KV cache of the unchanged prefix is reused
+            out = self._llama(f"{system}\n{prompt}" if system else prompt, **self._llama_kwargs())
+            text = _cut_at_stop(_strip_labels(out["choices"][0]["text"].strip()))
+            return self._sanitize_response(text, prompt)
+        except Exception as e:
+            log.error("llama.cpp error: %s", e)
             return self._generate_fallback(prompt)
 
+    def _stream_llama_cpp(self, prompt: str, system: str = ""):
+        started = False
+        try:
+            chunks = self._llama(
+                f"{system}\n{prompt}" if system else prompt, stream=True, **self._llama_kwargs()
+            )
+            for piece in _clean_stream(c["choices"][0]["text"] for c in chunks):
+                started = True
+                yield piece
+        except Exception as e:
+            log.error("llama.cpp error: %s", e)
+            if not started:
+                yield self._generate_fallback(prompt)
+
+    def _stream_fallback(self, prompt: str, system: str = ""):
+        yield self._generate_fallback(prompt)
+
     def _sanitize_for_speech(self, text: str) -> str:
         """New robust sanitizer for natural text-to-speech."""
         if not text: return ""
 
         # Remove markdown links [text](url) -> text
-        import re
         text = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', text)
         
         # Remove raw URLs
@@ -636,7 +1516,7 @@ class AIPersonality:
         text = text.replace("As an AI assistant", "As your companion").strip()
         
         # Emoji and Non-ASCII cleanup for smooth TTS
-        text = "".join(c for c in text if c.isascii() or c.isalnum() or c in " .,!?-")
+        text = _speech_chars(text)
         
         # Final cleanup
         text = text.lstrip(" :.,!?-")
@@ -646,118 +1526,72 @@ class AIPersonality:
         return text[:500].strip()
 
 
-    def _generate_fallback(self, prompt: str) -> str:
+    def _generate_fallback(self, prompt: str, system: str = "") -> str:
         """Friendly local responses when AI is offline."""
-        prompt_lower = prompt.lower()
-        
+        self._fell_back = True
         # Identity queries
-        if 'who are you' in prompt_lower or 'your name' in prompt_lower:
+        if _ASK_IDENTITY_RE.search(prompt):
             return "I'm MEMO, your desktop buddy! 🤙"
         
-        if 'who am i' in prompt_lower or 'my name' in prompt_lower:
+        if _ASK_USER_RE.search(prompt):
             return f"You're {self.user_name}! My favorite human. 😄"
 
         # General curiosity
-        responses = [
-            "Ooh, good question! My brain's a bit foggy right now though. ☁️",
-            "I'm not exactly sure, but I'm vibes-only right now! 😎",
-            "Total mystery to me! Let's just vibe instead. 🤙",
-            "I'd look that up for you, but I'm currently in 'chill mode'. 😌",
-            "Interesting... I'll have to think about that one! 🤔",
-            "You always have the most interesting questions! I'm stumped though. 😄"
-        ]
-        return random.choice(responses)
+        return self._line('fallback')
     
     # === PLAYFUL PRE-BUILT RESPONSES ===
     
+    def _line(self, kind: str) -> str:
+        """Next canned line of `kind` from its shuffled rotation."""
+        with self._lines_lock:
+            return next(self._lines[kind])
+    
     def startup_message(self) -> str:
         time_period = self._get_time_context()
-        
-        greetings = {
-            'morning': ["Mornin'! ☀️ Let's vibe."],
-            'afternoon': ["Yo! Chill afternoon vibes. 🌤️"],
-            'evening': ["Evening! What's good? 🌆"],
-            'night': ["Night owl crew represent! 🦉"],
-        }
-        return random.choice(greetings.get(time_period, greetings['afternoon']))
+        return self._line(time_period if time_period in _GREETINGS_BY_TIME else 'afternoon')
     
     def greeting(self, name: str) -> str:
         self.user_name = name
         return f"Yo {name}! 👊"
     
     def focus_on(self) -> str:
-        return random.choice([
-            "Focus mode! Phone goes brrr... into your pocket! 📱🚫",
-            "Alright, locking in! I'll be your phone police 👮",
-            "Focus time! Don't worry, I got your back!",
-            "Entering the zone! No distractions allowed!",
-            "Focus mode activated! Let's do this thing! 💪",
-        ])
+        return self._line('focus_on')
     
     def focus_off(self) -> str:
-        return random.choice([
-            "Chill mode! Scroll away my friend 📱",
-            "Focus off! You're free! 🦅",
-            "Okay okay, I'll stop being the phone police 😄",
-            "Freedom! Do whatever you want!",
-            "Break time! You earned it!",
-        ])
+        return self._line('focus_off')
     
-    def phone_alert(self) -> str:
-        return random.choice([
-            "Phone! Alert! Put it down! 📱😱",
-            "Excuse me, is that a PHONE I see?! 👀",
-            "Bruh, the phone can wait! 😤",
-            "Phone spotted! The memes will still be there later!",
-            "Hey! Focus time, not TikTok time! 📱❌",
-            "Your phone misses you but I miss your attention more! 😢",
-        ])
+    def _alert_due(self, kind: str) -> bool:
+        """True if `kind` has not fired within ALERT_COOLDOWN (and marks it fired)."""
+        now = time.monotonic()
+        if now - self._last_alert[kind] < self.ALERT_COOLDOWN:
+            return False
+        self._last_alert[kind] = now
+        return True
     
-    def posture_reminder(self, pose: str) -> str:
-        if pose == 'sitting':
-            return random.choice([
-                "Stretch break? Your back is begging! 🙏",
-                "Hey! Stand up and wiggle a bit! 💃",
-                "Your spine called, it wants a break!",
-                "Time to stand! Even I need to stretch... wait, I'm software 🤖",
-                "Move it move it! Quick stretch! 🏃",
-            ])
-        else:
-            return random.choice([
-                "Legs tired? Take a seat, champ! 🪑",
-                "You can sit down! Standing contest is over 😄",
-                "Rest those legs! You've been a good human!",
-                "Sit sit sit! Chair misses you!",
-            ])
+    def phone_alert(self) -> Optional[str]:
+        """Phone distraction quip, or None while the alert is cooling down."""
+        if not self._alert_due('phone'):
+            return None
+        return self._line('phone')
+    
+    def posture_reminder(self, pose: str) -> Optional[str]:
+        """Posture nudge, or None while the alert is cooling down."""
+        if not self._alert_due('posture'):
+            return None
+        return self._line('sitting' if pose == 'sitting' else 'standing')
     
-    def proximity_alert(self) -> str:
-        return random.choice([
-            "Whoa there! Too close! Step back! 👀",
-            "Your face is gonna merge with the screen! Back up!",
-            "Easy on the eyes! Move back a bit! 👓",
-            "Screen's not going anywhere! Scoot back!",
-            "Personal space! For you AND the screen! 😄",
-        ])
+    def proximity_alert(self) -> Optional[str]:
+        """Too-close warning, or None while the alert is cooling down."""
+        if not self._alert_due('proximity'):
+            return None
+        return self._line('proximity')
     
     def goodbye(self, name: str = None) -> str:
         name = name or self.user_name
-        return random.choice([
-            f"Later {name}! ✌️",
-            f"Bye {name}! Don't be a stranger!",
-            "Peace out! Catch ya later! 🤙",
-            f"See ya, {name}! Stay awesome!",
-            "Byeee! Come back soon! 👋",
-            f"Later gator! Take care, {name}!",
-        ])
+        return self._line('goodbye').format(name=name)
     
     def ready_message(self) -> str:
-        return random.choice([
-            "All set! What's the vibe today? 😎",
-            "Ready when you are! Let's hang!",
-            "I'm here! What's on your mind?",
-            "Ayy, I'm ready! What we doing?",
-            "Systems go! What's up? 🚀",
-        ])
+        return self._line('ready')
 
 
 # Global instance
@@ -0,0 +1,207 @@
+"""
+MEMO - Response Cache
+=====================
+Two-tier cache for LLM replies so repeated questions skip the network.
+
+Tier 1: exact LRU keyed on (response_type, context, normalized prompt).
+Tier 2: semantic lookup over prompt embeddings (cosine similarity),
+        enabled only when sentence-transformers and numpy are installed.
+"""
+
+import os
+import pickle
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+log = logging.getLogger("memo.personality")
+
+# Optional dependencies for the semantic tier
+HAS_NUMPY = False
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    pass
+
+HAS_SENTENCE_TRANSFORMERS = False
+try:
+    import sentence_transformers  # noqa: F401 (model is loaded lazily)
+    HAS_SENTENCE_TRANSFORMERS = True
+except ImportError:
+    pass
+
+CACHE_PATH = "data/response_cache.pkl"
+EMBED_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+def _normalize(prompt: str) -> str:
+    return " ".join(prompt.lower().split())
+
+
+class ResponseCache:
+    """Exact + semantic cache of generated responses."""
+
+    def __init__(
+        self,
+        capacity: int = 512,
+        threshold: float = 0.92,
+        semantic: bool = True
+    ):
+        """
+        Args:
+            capacity: Maximum number of cached responses (LRU eviction)
+            threshold: Minimum cosine similarity for a semantic hit
+            semantic: Enable the embedding tier if its dependencies exist
+        """
+        self.capacity = capacity
+        self.threshold = threshold
+        self.semantic = semantic and HAS_NUMPY and HAS_SENTENCE_TRANSFORMERS
+
+        # key -> (scope, response)
+        self._entries: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        # key -> normalized float32 embedding
+        self._vectors: "OrderedDict[str, object]" = OrderedDict()
+        self._matrix = None       # stacked vectors, rebuilt lazily
+        self._matrix_keys = []
+        self._model = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    # ---- keys & embeddings ----
+
+    @staticmethod
+    def _scope(context: str, response_type: str) -> str:
+        return f"{response_type}|{context}"
+
+    @staticmethod
+    def _key(scope: str, norm_prompt: str) -> str:
+        return hashlib.sha1(f"{scope}|{norm_prompt}".encode("utf-8")).hexdigest()
+
+    def _embed(self, text: str):
+        if self._model is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+                self._model = SentenceTransformer(EMBED_MODEL)
+            except Exception as e:
+                log.info("Semantic cache disabled: %s", e)
+                self.semantic = False
+                return None
+        vec = self._model.encode(text, normalize_embeddings=True)
+        return np.asarray(vec, dtype=np.float32)
+
+    def _semantic_lookup(self, scope: str, vec) -> Optional[str]:
+        if self._matrix is None:
+            if not self._vectors:
+                return None
+            self._matrix_keys = list(self._vectors.keys())
+            self._matrix = np.stack(list(self._vectors.values()))
+
+        scores = self._matrix @ vec
+        for idx in np.argsort(scores)[::-1]:
+            if scores[idx] < self.threshold:
+                break
+            entry = self._entries.get(self._matrix_keys[idx])
+            if entry and entry[0] == scope:
+                self._entries.move_to_end(self._matrix_keys[idx])
+                return entry[1]
+        return None
+
+    # ---- public API ----
+
+    def get(self, context: str, prompt: str, response_type: str = "quick") -> Optional[str]:
+        """Return a cached response for this prompt, or None on miss."""
+        scope = self._scope(context, response_type)
+        norm = _normalize(prompt)
+        key = self._key(scope, norm)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            if self.semantic:
+                vec = self._embed(norm)
+                if vec is not None:
+                    hit = self._semantic_lookup(scope, vec)
+                    if hit is not None:
+                        self.hits += 1
+                        return hit
+
+            self.misses += 1
+            return None
+
+    def put(self, context: str, prompt: str, response: str, response_type: str = "quick") -> None:
+        """Store a response for this prompt."""
+        if not response:
+            return
+        scope = self._scope(context, response_type)
+        norm = _normalize(prompt)
+        key = self._key(scope, norm)
+
+        with self._lock:
+            self._entries[key] = (scope, response)
+            self._entries.move_to_end(key)
+
+            if self.semantic and key not in self._vectors:
+                vec = self._embed(norm)
+                if vec is not None:
+                    self._vectors[key] = vec
+                    self._matrix = None
+
+            while len(self._entries) > self.capacity:
+                old_key, _ = self._entries.popitem(last=False)
+                if self._vectors.pop(old_key, None) is not None:
+                    self._matrix = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._vectors.clear()
+            self._matrix = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ---- persistence ----
+
+    def save(self, path: str = CACHE_PATH) -> None:
+        """Persist cached entries (and embeddings) so warm start is instant."""
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with self._lock:
+                data = {
+                    'entries': list(self._entries.items()),
+                    'vectors': list(self._vectors.items()),
+                }
+            tmp = f"{path}.tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except Exception as e:
+            log.warning("Failed to save response cache: %s", e)
+
+    def load(self, path: str = CACHE_PATH) -> None:
+        """Load entries saved by save(); missing or corrupt files are ignored."""
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "rb") as f:
+                data = pickle.load(f)
+        except Exception as e:
+            log.warning("Failed to load response cache: %s", e)
+            return
+
+        with self._lock:
+            self._entries = OrderedDict(data.get('entries', [])[-self.capacity:])
+            if self.semantic:
+                self._vectors = OrderedDict(
+                    (k, v) for k, v in data.get('vectors', []) if k in self._entries
+                )
+            self._matrix = None
@@ -1,6 +1,8 @@
 import cv2
 import os
+import re
 import glob
+from concurrent.futures import ThreadPoolExecutor
 
 print("=== MEMO CAMERA DIAGNOSTIC ===")
 
@@ -10,19 +12,38 @@ print(f"Found devices: {devices}")
 if not devices:
     print("❌ No /dev/video devices found! Is the camera connected?")
 
-# 2. Try OpenCV indices
-print("\nTesting OpenCV Indices...")
-for idx in range(10):
-    print(f"Testing Index {idx}...", end=" ", flush=True)
-    cap = cv2.VideoCapture(idx)
-    if cap.isOpened():
+# Probe only the indices that exist; fall back to 0-9 where there is no /dev/video*
+indices = sorted(int(m.group(1)) for m in (re.search(r'(\d+)$', d) for d in devices) if m)
+# Ask for V4L2 directly so OpenCV skips probing its other backends per index
+backend = cv2.CAP_V4L2 if indices else cv2.CAP_ANY
+if not indices:
+    indices = list(range(10))
+
+
+def probe(idx):
+    """Open one index; returns (idx, opened, shape or None)."""
+    cap = cv2.VideoCapture(idx, backend)
+    try:
+        if not cap.isOpened():
+            return idx, False, None
         ret, frame = cap.read()
-        if ret and frame is not None:
-            print(f"✓ WORKING! Resolution: {frame.shape[1]}x{frame.shape[0]}")
-            cap.release()
-        else:
-            print(f"Opened but failed to read frame.")
+        return idx, True, frame.shape if ret and frame is not None else None
+    finally:
+        cap.release()
+
+
+# 2. Try OpenCV indices (in parallel: a missing device can block ~1 s on open)
+print("\nTesting OpenCV Indices...")
+with ThreadPoolExecutor(max_workers=len(indices)) as pool:
+    results = list(pool.map(probe, indices))
+
+for idx, opened, shape in results:
+    print(f"Testing Index {idx}...", end=" ")
+    if shape is not None:
+        print(f"✓ WORKING! Resolution: {shape[1]}x{shape[0]}")
+    elif opened:
+        print(f"Opened but failed to read frame.")
     else:
         print("Failed to open.")
-        
+
 print("\n=== DIAGNOSTIC COMPLETE ===")
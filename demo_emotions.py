@@ -5,6 +5,7 @@ Test facial emotion detection.
 
 import cv2
 import sys
+import numpy as np
 from pathlib import Path
 
 try:
@@ -19,6 +20,32 @@ except ImportError as e:
     print(f"Import error: {e}")
     sys.exit(1)
 
+# Emotion bar panel geometry (bottom-left corner of the frame)
+BAR_HEIGHT = 12
+BAR_STEP = BAR_HEIGHT + 3
+PANEL_W, PANEL_H = 191, 121   # minimum backdrop: x 10..200, y h-130..h-10 (inclusive)
+BAR_COLOR = (0, 200, 200)
+
+_panels = {}
+
+
+def _bar_panel(names):
+    """Black backdrop with the 3-letter labels pre-drawn, built once per label set.
+
+    The height grows with the label count (FER+ models report 8 emotions,
+    the default backend 7) so every label and bar lands on the backdrop.
+    """
+    panel = _panels.get(names)
+    if panel is None:
+        panel_h = max(PANEL_H, 10 + len(names) * BAR_STEP + 6)
+        panel = np.zeros((panel_h, PANEL_W, 3), np.uint8)
+        for i, name in enumerate(names):
+            cv2.putText(panel, name[:3], (5, 20 + i * BAR_STEP),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
+        _panels[names] = panel
+    return panel
+
+
 def main():
     print("\n" + "=" * 60)
     print("MEMO Emotion Detection Demo")
@@ -100,21 +127,18 @@ def main():
                 # Show emotion bar
                 if result.all_emotions:
                     h = frame.shape[0]
-                    bar_y = h - 120
                     
-                    # Background
-                    cv2.rectangle(frame, (10, bar_y - 10), (200, h - 10), (0, 0, 0), -1)
+                    # Background + labels: one blit of the pre-rendered panel
+                    panel = _bar_panel(tuple(result.all_emotions))
+                    top = h - 9 - panel.shape[0]   # bottom row stays at h-10
+                    bar_y = top + 10
+                    frame[top:top + panel.shape[0], 10:10 + PANEL_W] = panel
                     
-                    # Emotion bars
-                    bar_height = 12
-                    for i, (emotion_name, score) in enumerate(result.all_emotions.items()):
-                        y = bar_y + i * (bar_height + 3)
+                    # Emotion bars: only the widths change per frame
+                    for i, score in enumerate(result.all_emotions.values()):
+                        y = bar_y + i * BAR_STEP
                         bar_width = int(score * 150)
-                        
-                        cv2.putText(frame, emotion_name[:3], (15, y + 10),
-                                   cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
-                        cv2.rectangle(frame, (50, y), (50 + bar_width, y + bar_height),
-                                     (0, 200, 200), -1)
+                        frame[y:y + BAR_HEIGHT + 1, 50:51 + bar_width] = BAR_COLOR
             else:
                 # No face detected
                 cv2.putText(
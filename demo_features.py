@@ -5,14 +5,22 @@ Demonstrates logging, configuration, motion detection, and context awareness.
 
 import cv2
 import time
+import logging
 from pathlib import Path
 
 # Import new MEMO components
-from utils import get_logger, setup_logging
+from utils import get_logger, setup_logging, TextPanel, put_lines, YELLOW, GREEN, GRAY, DIM
+from utils import DemoState, KEY_HANDLERS
 from config import get_config
 from perception.motion_detector import MotionDetector
 from reasoning.context_manager import ContextManager
-from camera_input import CameraSource
+from camera_input import CameraSource, FramePipeline
+
+# Minimum gap between motion log lines (monotonic clock)
+MOTION_LOG_INTERVAL_NS = 5_000_000_000
+# After this long without motion, detect on fewer frames until something moves
+IDLE_AFTER_NS = 30_000_000_000
+IDLE_MOTION_SKIP = 3
 
 def main():
     # Setup logging
@@ -58,7 +66,10 @@ def main():
     motion_detector = MotionDetector(
         threshold=25,
         min_area=500,
-        use_mog2=False  # False for speed
+        use_mog2=False,  # False for speed
+        scale=0.5,  # Detect on a half-size frame
+        use_numba=True,  # JIT diff kernel when numba is installed
+        three_frame=True  # Ignore one-frame lighting flicker
     )
     logger.info("Motion detector ready")
     
@@ -75,139 +86,149 @@ def main():
     # Main loop
     logger.info("Starting main demo loop (Press 'q' to quit)")
     frame_count = 0
-    last_motion_log = 0
+    last_motion_log_ns = 0
+    last_motion_ns = time.monotonic_ns()
     user_present = False
+    motion_skip = max(1, config.perception.motion_skip)
+    # Hot-loop locals: motion_enabled is re-read after a key handler runs
+    motion_enabled = config.perception.enable_motion
+    skip = motion_skip  # Raised to IDLE_MOTION_SKIP while nothing moves
+    detect_motion = motion_detector.detect
+    log_every = 100
+    motion_detected, motion_score, motion_regions = False, 0.0, []
+    context_tick = -1
+    context_summary = context_manager.get_context_summary()
     
+    context_panel = TextPanel(441, 80)
+    footer_panel = TextPanel(441, 44)
+    footer_lines = (
+        (f"Personality: {config.system.personality_mode}", (10, 16), 0.5, GRAY, 1),
+        (f"Logging: {config.system.logging_level}", (10, 36), 0.5, GRAY, 1),
+    )
+    controls = DemoState(
+        log=lambda level, msg, *args: getattr(logger, level)(msg, *args),
+        config=config,
+        motion_detector=motion_detector,
+        context_manager=context_manager,
+        motion_enabled=motion_enabled,
+    )
     window_name = "MEMO Feature Demo"
-    cv2.namedWindow(window_name)
+    # Capture runs on its own thread; run() below moves processing to a
+    # worker so the window stays on the main thread
+    pipeline = FramePipeline(camera, window_name).start()
     
-    while True:
-        frame = camera.get_frame()
-        if frame is None:
-            time.sleep(0.01)
-            continue
+    # Per-frame processing, run on the pipeline's worker thread
+    def process():
+        nonlocal frame_count, last_motion_log_ns, last_motion_ns, user_present, motion_enabled, skip
+        nonlocal motion_detected, motion_score, motion_regions, context_tick, context_summary
+        while pipeline.running:
+            frame = pipeline.get_frame()
+            if frame is None:
+                # Nothing new to process or draw; only keep 'q' responsive
+                if pipeline.get_key() == ord('q'):
+                    logger.info("User requested quit")
+                    break
+                continue
         
-        frame_count += 1
-        timestamp = time.time()
+            frame_count += 1
         
-        # Motion detection (every frame for demo)
-        if config.perception.enable_motion:
-            motion_detected, motion_score, motion_regions = motion_detector.detect(frame)
-            
-            # Log significant motion
-            if motion_detected and (timestamp - last_motion_log) > 5.0:
-                logger.info(f"Motion detected! Score: {motion_score:.3f}, Regions: {len(motion_regions)}")
-                last_motion_log = timestamp
+            # Motion detection (every motion_skip frames; skipped frames reuse the last result)
+            if motion_enabled:
+                if frame_count % skip == 0:
+                    motion_detected, motion_score, motion_regions = detect_motion(frame)
+                    now_ns = time.monotonic_ns()
                 
-                # Check if this could be user arriving
-                if not user_present and motion_score > 0.05:
-                    user_present = True
-                    context_manager.update_presence(True)
-                    greeting = context_manager.get_greeting("Jayadeep")
-                    if greeting:
-                        logger.info(f"🗣️  {greeting}")
-                        print(f"\n{greeting}\n")
+                    # Log significant motion
+                    if motion_detected and now_ns - last_motion_log_ns > MOTION_LOG_INTERVAL_NS:
+                        logger.info("Motion detected! Score: %.3f, Regions: %d", motion_score, len(motion_regions))
+                        last_motion_log_ns = now_ns
+                    
+                        # Check if this could be user arriving
+                        if not user_present and motion_score > 0.05:
+                            user_present = True
+                            context_manager.update_presence(True)
+                            greeting = context_manager.get_greeting("Jayadeep")
+                            if greeting:
+                                logger.info("🗣️  %s", greeting)
+                                print(f"\n{greeting}\n")
+                
+                    # Back off to every IDLE_MOTION_SKIP-th frame after a quiet spell
+                    if motion_detected:
+                        last_motion_ns = now_ns
+                        skip = motion_skip
+                    elif now_ns - last_motion_ns > IDLE_AFTER_NS:
+                        skip = max(motion_skip, IDLE_MOTION_SKIP)
             
-            # Visualize motion
-            if motion_regions:
-                frame = motion_detector.visualize(frame, motion_regions)
-        
-        # Update context
-        context_manager.update_presence(user_present)
-        
-        # Display info overlay
-        h, w = frame.shape[:2]
-        
-        # Background for text
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (10, 10), (450, 180), (0, 0, 0), -1)
-        frame = cv2.addWeighted(overlay, 0.6, frame, 0.4, 0)
-        
-        # Info text
-        info_y = 30
-        line_height = 25
-        
-        # Context info
-        context_summary = context_manager.get_context_summary()
-        cv2.putText(frame, f"Time of Day: {context_summary['time_of_day']}", 
-                   (20, info_y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
-        info_y += line_height
-        
-        cv2.putText(frame, f"User State: {context_summary['user_state']}", 
-                   (20, info_y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
-        info_y += line_height
+                # Visualize motion
+                if motion_regions and pipeline.visible:
+                    motion_detector.visualize(frame, motion_regions, dst=frame)
         
-        cv2.putText(frame, f"Session: {context_summary['session_duration']}", 
-                   (20, info_y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
-        info_y += line_height
-        
-        # Motion info
-        if config.perception.enable_motion:
-            motion_color = (0, 255, 0) if motion_detected else (100, 100, 100)
-            motion_text = f"Motion: {'YES' if motion_detected else 'NO'}"
-            if motion_detected:
-                motion_text += f" ({motion_score:.2%})"
-            cv2.putText(frame, motion_text, (20, info_y), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, motion_color, 2)
-            info_y += line_height
-        
-        # Frame counter
-        cv2.putText(frame, f"Frame: {frame_count}", 
-                   (20, info_y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 200), 2)
-        
-        # Config info (bottom)
-        cv2.putText(frame, f"Personality: {config.system.personality_mode}", 
-                   (20, h - 40), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
-        cv2.putText(frame, f"Logging: {config.system.logging_level}", 
-                   (20, h - 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
+            # Update context once a second; the summary has no finer resolution.
+            # update_presence(True) also refreshes the last-seen time, so it is
+            # repeated on each tick while the user is present.
+            now_s = int(time.monotonic())
+            if now_s != context_tick:
+                context_tick = now_s
+                if user_present:
+                    context_manager.update_presence(True)
+                context_summary = context_manager.get_context_summary()
         
-        # Show frame
-        cv2.imshow(window_name, frame)
+            # Skip the overlay and imshow while the window is minimized or hidden;
+            # detection above still runs so greetings keep firing
+            if pipeline.visible:
+                # Display info overlay
+                h, w = frame.shape[:2]
+            
+                # Background for text: scale the panel region to 40% in place
+                roi = frame[10:181, 10:451]
+                cv2.convertScaleAbs(roi, dst=roi, alpha=0.4)
+            
+                # Info text
+                info_y = 30
+                line_height = 25
+            
+                # Context info (re-rasterized only when the text changes)
+                context_panel.draw(frame, 10, 10, (
+                    (f"Time of Day: {context_summary['time_of_day']}", (10, 20), 0.6, YELLOW, 2),
+                    (f"User State: {context_summary['user_state']}", (10, 45), 0.6, YELLOW, 2),
+                    (f"Session: {context_summary['session_duration']}", (10, 70), 0.6, YELLOW, 2),
+                ))
+                info_y += 3 * line_height
+            
+                # Motion info and frame counter (change every frame, so drawn live)
+                live_lines = []
+                if motion_enabled:
+                    motion_text = f"Motion: {'YES' if motion_detected else 'NO'}"
+                    if motion_detected:
+                        motion_text += f" ({motion_score:.2%})"
+                    live_lines.append((motion_text, GREEN if motion_detected else DIM))
+                live_lines.append((f"Frame: {frame_count}", GRAY))
+                put_lines(frame, live_lines, 20, info_y, line_height, 0.6, 2)
+            
+                # Config info (bottom)
+                footer_panel.draw(frame, 10, h - 56, footer_lines)
+            
+                # Show frame
+                pipeline.show(frame)
         
-        # Keyboard controls
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q'):
-            logger.info("User requested quit")
-            break
-        elif key == ord('m'):
-            # Toggle motion detection
-            config.perception.enable_motion = not config.perception.enable_motion
-            logger.info(f"Motion detection: {'ON' if config.perception.enable_motion else 'OFF'}")
-        elif key == ord('r'):
-            # Reset motion detector
-            motion_detector.reset()
-            logger.info("Motion detector reset")
-        elif key == ord('g'):
-            # Force greeting
-            greeting = context_manager.get_greeting("Jayadeep")
-            if greeting:
-                logger.info(f"🗣️  {greeting}")
-                print(f"\n{greeting}\n")
-        elif key == ord('c'):
-            # Show context summary
-            logger.info("=" * 40)
-            logger.info("Context Summary:")
-            for key, value in context_summary.items():
-                logger.info(f"  {key}: {value}")
-            logger.info("=" * 40)
-        elif key == ord('h'):
-            # Show help
-            print("\n" + "=" * 60)
-            print("Keyboard Controls:")
-            print("  q - Quit")
-            print("  m - Toggle motion detection")
-            print("  r - Reset motion detector")
-            print("  g - Force greeting")
-            print("  c - Show context summary in log")
-            print("  h - Show this help")
-            print("=" * 60 + "\n")
+            # Keyboard controls
+            key = pipeline.get_key()
+            handler = KEY_HANDLERS.get(key)
+            if handler:
+                controls.context_summary = context_summary
+                if handler(controls) == 'quit':
+                    break
+                motion_enabled = controls.motion_enabled
         
-        # Log every 100 frames
-        if frame_count % 100 == 0:
-            logger.debug(f"Processed {frame_count} frames")
+            # Log every 100 frames
+            if frame_count % log_every == 0 and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Processed %d frames", frame_count)
+
+    pipeline.run(process)
     
     # Cleanup
     logger.info("Shutting down...")
+    pipeline.stop()
     camera.release()
     cv2.destroyAllWindows()
     
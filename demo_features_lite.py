@@ -6,15 +6,17 @@ Does NOT require YOLO/PyTorch - uses only lightweight features.
 
 import cv2
 import time
+import logging
 import sys
 from pathlib import Path
 
 # Import new MEMO components (lightweight only)
 try:
-    from utils import get_logger, setup_logging
+    from utils import get_logger, setup_logging, TextPanel, put_lines, YELLOW, GREEN, GRAY, DIM
+    from utils import DemoState, KEY_HANDLERS
     from config import get_config
     from reasoning.context_manager import ContextManager
-    from camera_input import CameraSource
+    from camera_input import CameraSource, FramePipeline
     
     # Import motion detector separately (doesn't need torch)
     sys.path.insert(0, str(Path(__file__).parent))
@@ -26,6 +28,12 @@ except ImportError as e:
     print("  pip install opencv-python colorlog pyyaml psutil")
     sys.exit(1)
 
+# Minimum gap between motion log lines (monotonic clock)
+MOTION_LOG_INTERVAL_NS = 5_000_000_000
+# After this long without motion, detect on fewer frames until something moves
+IDLE_AFTER_NS = 30_000_000_000
+IDLE_MOTION_SKIP = 3
+
 def main():
     print("\n" + "=" * 60)
     print("MEMO LITE DEMO - Advanced Features (No PyTorch Required)")
@@ -40,12 +48,12 @@ def main():
         print("Continuing without logging...")
         logger = None
     
-    def log(level, msg):
-        """Fallback logging if logger fails."""
+    def log(level, msg, *args):
+        """Fallback logging if logger fails (lazy %-style args like logging)."""
         if logger:
-            getattr(logger, level)(msg)
+            getattr(logger, level)(msg, *args)
         else:
-            print(f"[{level.upper()}] {msg}")
+            print(f"[{level.upper()}] {msg % args if args else msg}")
     
     log('info', "=" * 60)
     log('info', "MEMO Lite Demo - No Heavy Dependencies")
@@ -79,6 +87,7 @@ def main():
                 rotation = 0
             class perception:
                 enable_motion = True
+                motion_skip = 2
             class system:
                 logging_level = "INFO"
                 personality_mode = "helpful"
@@ -108,7 +117,10 @@ def main():
         motion_detector = MotionDetector(
             threshold=25,
             min_area=500,
-            use_mog2=False  # False for speed
+            use_mog2=False,  # False for speed
+            scale=0.5,  # Detect on a half-size frame
+            use_numba=True,  # JIT diff kernel when numba is installed
+            three_frame=True  # Ignore one-frame lighting flicker
         )
         log('info', "✓ Motion detector ready")
     except Exception as e:
@@ -140,148 +152,154 @@ def main():
     print("  h - Show help\n")
     
     frame_count = 0
-    last_motion_log = 0
+    last_motion_log_ns = 0
+    last_motion_ns = time.monotonic_ns()
     user_present = False
     motion_enabled = True
+    motion_skip = max(1, getattr(config.perception, 'motion_skip', 2))
+    # Hot-loop locals
+    skip = motion_skip  # Raised to IDLE_MOTION_SKIP while nothing moves
+    detect_motion = motion_detector.detect if motion_detector else None
+    log_every = 100
+    motion_detected, motion_score, motion_regions = False, 0.0, []
+    context_tick = -1
+    context_summary = {}
     
+    header_panel = TextPanel(441, 105)
+    status_panel = TextPanel(441, 22)
+    status_lines = (("Press 'h' for help | 'q' to quit", (10, 16), 0.5, (150, 150, 150), 1),)
+    controls = DemoState(
+        log=log,
+        config=config,
+        motion_detector=motion_detector,
+        context_manager=context_manager,
+        motion_enabled=motion_enabled,
+    )
     window_name = "MEMO Lite Demo (No PyTorch)"
-    cv2.namedWindow(window_name)
+    # Capture runs on its own thread; run() below moves processing to a
+    # worker so the window stays on the main thread
+    pipeline = FramePipeline(camera, window_name).start()
     
-    try:
-        while True:
-            frame = camera.get_frame()
+    # Per-frame processing, run on the pipeline's worker thread
+    def process():
+        nonlocal frame_count, last_motion_log_ns, last_motion_ns, user_present, motion_enabled, skip
+        nonlocal motion_detected, motion_regions, motion_score, context_tick, context_summary
+        while pipeline.running:
+            frame = pipeline.get_frame()
             if frame is None:
-                time.sleep(0.01)
+                # Nothing new to process or draw; only keep 'q' responsive
+                if pipeline.get_key() == ord('q'):
+                    log('info', "User requested quit")
+                    break
                 continue
             
             frame_count += 1
-            timestamp = time.time()
             
-            # Motion detection
+            # Motion detection (every motion_skip frames; skipped frames reuse the last result)
             if motion_detector and motion_enabled:
                 try:
-                    motion_detected, motion_score, motion_regions = motion_detector.detect(frame)
-                    
-                    # Log significant motion
-                    if motion_detected and (timestamp - last_motion_log) > 5.0:
-                        log('info', f"Motion! Score: {motion_score:.3f}, Regions: {len(motion_regions)}")
-                        last_motion_log = timestamp
+                    if frame_count % skip == 0:
+                        motion_detected, motion_score, motion_regions = detect_motion(frame)
+                        now_ns = time.monotonic_ns()
                         
-                        # Check if this could be user arriving
-                        if not user_present and motion_score > 0.05:
-                            user_present = True
-                            if context_manager:
-                                context_manager.update_presence(True)
-                                greeting = context_manager.get_greeting("Jayadeep")
-                                if greeting:
-                                    log('info', f"🗣️  {greeting}")
-                                    print(f"\n✨ {greeting}\n")
+                        # Log significant motion
+                        if motion_detected and now_ns - last_motion_log_ns > MOTION_LOG_INTERVAL_NS:
+                            log('info', "Motion! Score: %.3f, Regions: %d", motion_score, len(motion_regions))
+                            last_motion_log_ns = now_ns
+                            
+                            # Check if this could be user arriving
+                            if not user_present and motion_score > 0.05:
+                                user_present = True
+                                if context_manager:
+                                    context_manager.update_presence(True)
+                                    greeting = context_manager.get_greeting("Jayadeep")
+                                    if greeting:
+                                        log('info', "🗣️  %s", greeting)
+                                        print(f"\n✨ {greeting}\n")
+                        
+                        # Back off to every IDLE_MOTION_SKIP-th frame after a quiet spell
+                        if motion_detected:
+                            last_motion_ns = now_ns
+                            skip = motion_skip
+                        elif now_ns - last_motion_ns > IDLE_AFTER_NS:
+                            skip = max(motion_skip, IDLE_MOTION_SKIP)
                     
                     # Visualize motion
-                    if motion_regions:
-                        frame = motion_detector.visualize(frame, motion_regions)
+                    if motion_regions and pipeline.visible:
+                        motion_detector.visualize(frame, motion_regions, dst=frame)
                 except Exception as e:
                     log('error', f"Motion detection error: {e}")
             
-            # Update context
-            if context_manager:
+            # Update context once a second; the summary has no finer resolution.
+            # update_presence(True) also refreshes the last-seen time, so it is
+            # repeated on each tick while the user is present.
+            now_s = int(time.monotonic())
+            if context_manager and now_s != context_tick:
+                context_tick = now_s
                 try:
-                    context_manager.update_presence(user_present)
+                    if user_present:
+                        context_manager.update_presence(True)
                     context_summary = context_manager.get_context_summary()
                 except Exception as e:
                     log('error', f"Context update error: {e}")
                     context_summary = {}
-            else:
-                context_summary = {}
-            
-            # Display info overlay
-            h, w = frame.shape[:2]
             
-            # Background for text
-            overlay = frame.copy()
-            cv2.rectangle(overlay, (10, 10), (450, 180), (0, 0, 0), -1)
-            frame = cv2.addWeighted(overlay, 0.6, frame, 0.4, 0)
-            
-            # Info text
-            info_y = 30
-            line_height = 25
-            
-            # Header
-            cv2.putText(frame, "MEMO LITE - No PyTorch Required", 
-                       (20, info_y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
-            info_y += line_height
-            
-            # Context info
-            if context_summary:
-                cv2.putText(frame, f"Time: {context_summary.get('time_of_day', 'N/A')}", 
-                           (20, info_y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
-                info_y += line_height
+            # Skip the overlay and imshow while the window is minimized or hidden;
+            # detection above still runs so greetings keep firing
+            if pipeline.visible:
+                # Display info overlay
+                h, w = frame.shape[:2]
                 
-                cv2.putText(frame, f"User: {context_summary.get('user_state', 'N/A')}", 
-                           (20, info_y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
-                info_y += line_height
+                # Background for text: scale the panel region to 40% in place
+                roi = frame[10:181, 10:451]
+                cv2.convertScaleAbs(roi, dst=roi, alpha=0.4)
                 
-                cv2.putText(frame, f"Session: {context_summary.get('session_duration', 'N/A')}", 
-                           (20, info_y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
-                info_y += line_height
-            
-            # Motion info
-            if motion_detector:
-                motion_color = (0, 255, 0) if (motion_enabled and 'motion_detected' in locals() and motion_detected) else (100, 100, 100)
-                motion_text = f"Motion: {'ON' if motion_enabled else 'OFF'}"
-                if motion_enabled and 'motion_score' in locals():
-                    motion_text += f" ({motion_score:.2%})"
-                cv2.putText(frame, motion_text, (20, info_y), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, motion_color, 1)
-                info_y += line_height
-            
-            # Frame counter
-            cv2.putText(frame, f"Frames: {frame_count}", 
-                       (20, info_y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
-            
-            # Status bar (bottom)
-            cv2.putText(frame, "Press 'h' for help | 'q' to quit", 
-                       (20, h - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (150, 150, 150), 1)
-            
-            # Show frame
-            cv2.imshow(window_name, frame)
+                # Info text
+                info_y = 30
+                line_height = 25
+                
+                # Header and context info (re-rasterized only when the text changes)
+                header_lines = (("MEMO LITE - No PyTorch Required", (10, 20), 0.6, YELLOW, 2),)
+                if context_summary:
+                    header_lines += (
+                        (f"Time: {context_summary.get('time_of_day', 'N/A')}", (10, 45), 0.5, YELLOW, 1),
+                        (f"User: {context_summary.get('user_state', 'N/A')}", (10, 70), 0.5, YELLOW, 1),
+                        (f"Session: {context_summary.get('session_duration', 'N/A')}", (10, 95), 0.5, YELLOW, 1),
+                    )
+                header_panel.draw(frame, 10, 10, header_lines)
+                info_y += len(header_lines) * line_height
+                
+                # Motion info and frame counter (change every frame, so drawn live)
+                live_lines = []
+                if motion_detector:
+                    motion_text = f"Motion: {'ON' if motion_enabled else 'OFF'}"
+                    if motion_enabled:
+                        motion_text += f" ({motion_score:.2%})"
+                    live_lines.append((motion_text, GREEN if (motion_enabled and motion_detected) else DIM))
+                live_lines.append((f"Frames: {frame_count}", GRAY))
+                put_lines(frame, live_lines, 20, info_y, line_height, 0.5, 1)
+                
+                # Status bar (bottom)
+                status_panel.draw(frame, 10, h - 26, status_lines)
+                
+                # Show frame
+                pipeline.show(frame)
             
             # Keyboard controls
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q'):
-                log('info', "User requested quit")
-                break
-            elif key == ord('m'):
-                motion_enabled = not motion_enabled
-                log('info', f"Motion detection: {'ON' if motion_enabled else 'OFF'}")
-            elif key == ord('r') and motion_detector:
-                motion_detector.reset()
-                log('info', "Motion detector reset")
-            elif key == ord('g') and context_manager:
-                greeting = context_manager.get_greeting("Jayadeep")
-                if greeting:
-                    log('info', f"🗣️  {greeting}")
-                    print(f"\n✨ {greeting}\n")
-            elif key == ord('c') and context_summary:
-                print("\n" + "=" * 40)
-                print("Context Summary:")
-                for key, value in context_summary.items():
-                    print(f"  {key}: {value}")
-                print("=" * 40 + "\n")
-            elif key == ord('h'):
-                print("\n" + "=" * 60)
-                print("Keyboard Controls:")
-                print("  q - Quit")
-                print("  m - Toggle motion detection")
-                print("  r - Reset motion detector")
-                print("  g - Force greeting")
-                print("  c - Show context summary")
-                print("  h - Show this help")
-                print("=" * 60 + "\n")
+            key = pipeline.get_key()
+            handler = KEY_HANDLERS.get(key)
+            if handler:
+                controls.context_summary = context_summary
+                if handler(controls) == 'quit':
+                    break
+                motion_enabled = controls.motion_enabled
             
             # Log every 100 frames
-            if frame_count % 100 == 0 and logger:
-                logger.debug(f"Processed {frame_count} frames")
+            if frame_count % log_every == 0 and logger and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Processed %d frames", frame_count)
+
+    try:
+        pipeline.run(process)
     
     except KeyboardInterrupt:
         log('info', "Interrupted by user")
@@ -292,6 +310,7 @@ def main():
     finally:
         # Cleanup
         log('info', "Shutting down...")
+        pipeline.stop()
         camera.release()
         cv2.destroyAllWindows()
         
@@ -10,7 +10,7 @@ from pathlib import Path
 try:
     from utils import get_logger, setup_logging
     from config import get_config
-    from camera_input import CameraSource
+    from camera_input import CameraSource, FramePipeline
     
     # Import gesture recognizer
     sys.path.insert(0, str(Path(__file__).parent))
@@ -22,6 +22,9 @@ except ImportError as e:
     print("  pip install mediapipe opencv-python")
     sys.exit(1)
 
+# MediaPipe Hands costs 20-50 ms on CPU; gestures last far longer than two frames
+GESTURE_SKIP = 2
+
 def main():
     print("\n" + "=" * 60)
     print("MEMO Gesture Recognition Demo")
@@ -74,9 +77,13 @@ def main():
     print("\nPress 'q' to quit\n")
     
     window_name = "MEMO Gesture Demo"
-    cv2.namedWindow(window_name)
+    # Capture runs on its own thread; run() below moves processing to a
+    # worker so the window stays on the main thread
+    pipeline = FramePipeline(camera, window_name).start()
     
     last_gesture = None
+    frame_count = 0
+    result = None
     gesture_action_map = {
         Gesture.PEACE: "📸 Taking Selfie! Say cheese!",
         Gesture.FIST: "⏸️ Paused - Voice/Speaking stopped",
@@ -88,14 +95,20 @@ def main():
         Gesture.OK: "👌 Acknowledged",
     }
     
-    try:
-        while True:
-            frame = camera.get_frame()
+    # Per-frame processing, run on the pipeline's worker thread
+    def process():
+        nonlocal last_gesture, frame_count, result
+        while pipeline.running:
+            frame = pipeline.get_frame()
             if frame is None:
                 continue
             
-            # Detect gesture
-            result = gesture_recognizer.detect(frame)
+            frame_count += 1
+            
+            # Detect gesture on every GESTURE_SKIP-th frame; in between, reuse the
+            # last result (the new-gesture check below won't re-fire on it)
+            if frame_count % GESTURE_SKIP == 0:
+                result = gesture_recognizer.detect(frame)
             
             if result:
                 # Visualize
@@ -103,7 +116,7 @@ def main():
                 
                 # Log new gestures
                 if result.gesture != last_gesture and result.gesture != Gesture.UNKNOWN:
-                    logger.info(f"Gesture: {result.gesture.value} ({result.confidence:.0%})")
+                    logger.info("Gesture: %s (%.0f%%)", result.gesture.value, result.confidence * 100)
                     
                     # Trigger action
                     action = gesture_action_map.get(result.gesture)
@@ -125,16 +138,20 @@ def main():
                 )
             
             # Show frame
-            cv2.imshow(window_name, frame)
+            pipeline.show(frame)
             
             # Keyboard
-            if cv2.waitKey(1) & 0xFF == ord('q'):
+            if pipeline.get_key() == ord('q'):
                 break
+
+    try:
+        pipeline.run(process)
     
     except KeyboardInterrupt:
         logger.info("Interrupted")
     finally:
         logger.info("Shutting down...")
+        pipeline.stop()
         gesture_recognizer.cleanup()
         camera.release()
         cv2.destroyAllWindows()
@@ -6,12 +6,14 @@ Combines Motion Detection + Gesture Recognition + Emotion Detection
 import cv2
 import time
 import sys
+import zlib
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 try:
-    from utils import get_logger, setup_logging
+    from utils import get_logger, setup_logging, TextPanel, YELLOW, GREEN, DIM
     from config import get_config
-    from camera_input import CameraSource
+    from camera_input import CameraSource, FramePipeline
     
     sys.path.insert(0, str(Path(__file__).parent))
     from perception.motion_detector import MotionDetector
@@ -24,6 +26,15 @@ except ImportError as e:
     sys.exit(1)
 
 
+# Minimum gap between motion log lines (monotonic clock)
+MOTION_LOG_INTERVAL_NS = 5_000_000_000
+
+# Gesture/emotion input scale; both models work on ~200px inputs internally
+DETECT_SCALE = 0.5
+
+# Thumbnail the duplicate-frame digest is taken over (about 10x10-pixel cells at 640x480)
+THUMB_SIZE = (64, 48)
+
 def main():
     print("\n" + "=" * 70)
     print("   MEMO UNIFIED PERCEPTION DEMO")
@@ -49,13 +60,14 @@ def main():
         return
     
     # Initialize perception modules
-    motion_detector = MotionDetector(threshold=25, min_area=500)
+    motion_detector = MotionDetector(threshold=25, min_area=500, use_numba=True, max_regions=3)
     logger.info("✓ Motion detector ready")
     
-    gesture_recognizer = GestureRecognizer(stability_frames=3)
+    gesture_recognizer = GestureRecognizer(stability_frames=3, device=config.perception.device)
     logger.info("✓ Gesture recognizer ready")
     
-    emotion_detector = EmotionDetector(stability_frames=5)
+    # Fed DETECT_SCALE frames, so the minimum face size shrinks with them
+    emotion_detector = EmotionDetector(min_face_size=int(48 * DETECT_SCALE), stability_frames=5)
     logger.info("✓ Emotion detector ready")
     
     context_manager = ContextManager()
@@ -69,14 +81,32 @@ def main():
     print("  🖐️ Gesture Control   - Peace/Fist/Palm commands")
     print("  😊 Emotion Detection - Facial expression analysis")
     print("  🕐 Context Awareness - Time-based interactions")
-    print("\nPress 'q' to quit, 'h' for help\n")
+    # --headless: no window at all (no imshow/GUI event pumping); keys come
+    # from the terminal instead
+    headless = "--headless" in sys.argv
+    if headless:
+        print("\nHeadless: type 'q' + Enter to quit, 'h' + Enter for help\n")
+    else:
+        print("\nPress 'q' to quit, 'h' for help\n")
     
     window_name = "MEMO Unified Perception"
-    cv2.namedWindow(window_name)
+    # Capture runs on its own thread; run() below moves processing to a
+    # worker so the window stays on the main thread
+    pipeline = FramePipeline(camera, None if headless else window_name).start()
+    
+    # Status panel text; only lines whose text changes are re-rasterized
+    status_panel = TextPanel(271, 141)
+    
+    # One worker per detector, reused across frames
+    pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="memo-detect")
     
     # State tracking
     frame_count = 0
-    last_motion_time = 0
+    last_motion_log_ns = 0
+    last_thumb_digest = None
+    motion_result = (False, 0.0, [])
+    context_tick = -1
+    context = None
     last_gesture = None
     last_emotion = None
     is_paused = False
@@ -90,35 +120,73 @@ def main():
         Gesture.THUMBS_DOWN: ("👎 Noted", "dislike"),
     }
     
-    try:
-        while True:
-            frame = camera.get_frame()
+    # Per-frame processing, run on the pipeline's worker thread
+    def process():
+        nonlocal frame_count, last_motion_log_ns, last_thumb_digest, motion_result
+        nonlocal context_tick, context, last_gesture, last_emotion, is_paused
+        while pipeline.running:
+            frame = pipeline.get_frame()
             if frame is None:
                 continue
             
             frame_count += 1
-            current_time = time.time()
             h, w = frame.shape[:2]
             
-            # 1. MOTION DETECTION
-            motion_detected, motion_score, motion_regions = motion_detector.detect(frame)
+            # Grayscale once, before anything is drawn on the frame; shared by
+            # the motion detector and the OpenCV emotion fallback
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
             
-            if motion_detected and (current_time - last_motion_time) > 5.0:
+            # A stalled or static source still delivers new frame ids with the
+            # same pixels; a digest of a small thumbnail (microseconds) spots
+            # those, and the detectors are skipped for them
+            thumb_digest = zlib.crc32(cv2.resize(gray, THUMB_SIZE, interpolation=cv2.INTER_AREA))
+            fresh = thumb_digest != last_thumb_digest
+            last_thumb_digest = thumb_digest
+            
+            # Downscale once for gesture + emotion (full res stays for motion and
+            # display). The OpenCV gesture fallback uses pixel-size thresholds,
+            # so it keeps the full frame.
+            run_gesture = fresh and frame_count % 2 == 0
+            run_emotion = fresh and frame_count % 3 == 0
+            if run_gesture or run_emotion:
+                small = cv2.resize(frame, None, fx=DETECT_SCALE, fy=DETECT_SCALE,
+                                   interpolation=cv2.INTER_AREA)
+                small_gray = cv2.resize(gray, None, fx=DETECT_SCALE, fy=DETECT_SCALE,
+                                        interpolation=cv2.INTER_AREA)
+                gesture_input = small if gesture_recognizer.backend == "mediapipe_tasks" else frame
+            
+            # Run the detectors concurrently on the clean frame: MediaPipe and the
+            # OpenCV/FER paths release the GIL inside their native inference,
+            # so the frame costs roughly the slowest detector rather than the sum
+            motion_future = pool.submit(motion_detector.detect, frame, gray=gray) if fresh else None
+            # Gesture every 2nd frame, emotion every 3rd, for performance
+            gesture_future = pool.submit(gesture_recognizer.detect, gesture_input) if run_gesture else None
+            emotion_future = pool.submit(emotion_detector.detect, small, gray=small_gray) if run_emotion else None
+            
+            if motion_future:
+                motion_result = motion_future.result()
+            motion_detected, motion_score, motion_regions = motion_result
+            gesture_result = gesture_future.result() if gesture_future else None
+            emotion_result = emotion_future.result() if emotion_future else None
+            # Gesture landmarks are normalized; only the face box needs scaling back
+            if emotion_result and emotion_result.face_bbox:
+                emotion_result.face_bbox = tuple(int(v / DETECT_SCALE) for v in emotion_result.face_bbox)
+            
+            # 1. MOTION DETECTION
+            if motion_detected and time.monotonic_ns() - last_motion_log_ns > MOTION_LOG_INTERVAL_NS:
                 logger.info(f"Motion detected! Score: {motion_score:.2%}")
-                last_motion_time = current_time
+                last_motion_log_ns = time.monotonic_ns()
                 context_manager.update_presence(True)
             
-            # Draw motion regions
-            for region in motion_regions[:3]:  # Max 3 regions
-                cv2.rectangle(frame, (region.x, region.y),
-                             (region.x + region.width, region.y + region.height),
-                             (0, 0, 255), 1)
+            # Draw motion regions (the detector returns the 3 largest)
+            if pipeline.visible:
+                for region in motion_regions:
+                    cv2.rectangle(frame, (region.x, region.y),
+                                 (region.x + region.width, region.y + region.height),
+                                 (0, 0, 255), 1)
             
-            # 2. GESTURE RECOGNITION (every 2nd frame for performance)
-            gesture_result = None
-            if frame_count % 2 == 0:
-                gesture_result = gesture_recognizer.detect(frame)
-                
+            # 2. GESTURE RECOGNITION
+            if gesture_future:
                 if gesture_result and gesture_result.gesture != last_gesture:
                     if gesture_result.gesture in gesture_actions:
                         action_text, action_type = gesture_actions[gesture_result.gesture]
@@ -133,80 +201,67 @@ def main():
                     
                     last_gesture = gesture_result.gesture
                 
-                if gesture_result:
+                if gesture_result and pipeline.visible:
                     frame = gesture_recognizer.visualize(frame, gesture_result)
             
-            # 3. EMOTION DETECTION (every 3rd frame for performance)
-            emotion_result = None
-            if frame_count % 3 == 0:
-                emotion_result = emotion_detector.detect(frame)
-                
+            # 3. EMOTION DETECTION
+            if emotion_future:
                 if emotion_result and emotion_result.emotion != last_emotion:
                     if emotion_result.emotion != Emotion.UNKNOWN:
                         emoji = emotion_detector.get_emoji(emotion_result.emotion)
                         logger.info(f"Emotion: {emotion_result.emotion.value} {emoji}")
                     last_emotion = emotion_result.emotion
                 
-                if emotion_result:
+                if emotion_result and pipeline.visible:
                     frame = emotion_detector.visualize(frame, emotion_result)
             
-            # 4. STATUS PANEL (top-left)
-            panel_h = 150
-            overlay = frame.copy()
-            cv2.rectangle(overlay, (10, 10), (280, panel_h), (0, 0, 0), -1)
-            frame = cv2.addWeighted(overlay, 0.7, frame, 0.3, 0)
-            
-            y = 30
-            line_h = 22
-            
-            # Title
-            cv2.putText(frame, "MEMO Perception", (20, y),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
-            y += line_h + 5
-            
-            # Motion
-            motion_color = (0, 255, 0) if motion_detected else (100, 100, 100)
-            cv2.putText(frame, f"Motion: {'YES' if motion_detected else 'NO'} ({motion_score:.1%})",
-                       (20, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, motion_color, 1)
-            y += line_h
-            
-            # Gesture
-            if gesture_result:
-                gesture_text = gesture_result.gesture.value.replace('_', ' ').title()
-            else:
-                gesture_text = "None"
-            cv2.putText(frame, f"Gesture: {gesture_text}", (20, y),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
-            y += line_h
-            
-            # Emotion
-            if emotion_result:
-                emoji = emotion_detector.get_emoji(emotion_result.emotion)
-                emotion_text = f"{emotion_result.emotion.value.title()} {emoji}"
-            else:
-                emotion_text = "No face"
-            cv2.putText(frame, f"Emotion: {emotion_text}", (20, y),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
-            y += line_h
-            
-            # State
-            state_text = "PAUSED" if is_paused else "ACTIVE"
-            state_color = (0, 0, 255) if is_paused else (0, 255, 0)
-            cv2.putText(frame, f"State: {state_text}", (20, y),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, state_color, 1)
-            
-            # Context (bottom-left)
-            context = context_manager.get_context_summary()
-            cv2.putText(frame, f"Time: {context['time_of_day']} | Session: {context['session_duration']}",
-                       (20, h - 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (150, 150, 150), 1)
-            
-            # Frame counter (bottom-right)
-            cv2.putText(frame, f"Frame: {frame_count}", (w - 120, h - 20),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (150, 150, 150), 1)
-            
-            cv2.imshow(window_name, frame)
-            
-            key = cv2.waitKey(1) & 0xFF
+            # Everything below is display-only; skip it when nothing is shown
+            # (headless, or the window is minimized)
+            if pipeline.visible:
+                # 4. STATUS PANEL (top-left)
+                # 70% black over the panel is just the panel scaled to 30%, done in
+                # place on the ROI instead of copying and blending the whole frame
+                roi = frame[10:151, 10:281]
+                cv2.convertScaleAbs(roi, dst=roi, alpha=0.3)
+            
+                if gesture_result:
+                    gesture_text = gesture_result.gesture.value.replace('_', ' ').title()
+                else:
+                    gesture_text = "None"
+            
+                if emotion_result:
+                    emoji = emotion_detector.get_emoji(emotion_result.emotion)
+                    emotion_text = f"{emotion_result.emotion.value.title()} {emoji}"
+                else:
+                    emotion_text = "No face"
+            
+                # Title, motion, gesture, emotion, state (panel-relative positions)
+                status_panel.draw(frame, 10, 10, (
+                    ("MEMO Perception", (10, 20), 0.6, YELLOW, 2),
+                    (f"Motion: {'YES' if motion_detected else 'NO'} ({motion_score:.1%})",
+                     (10, 47), 0.5, GREEN if motion_detected else DIM, 1),
+                    (f"Gesture: {gesture_text}", (10, 69), 0.5, YELLOW, 1),
+                    (f"Emotion: {emotion_text}", (10, 91), 0.5, YELLOW, 1),
+                    ("State: PAUSED" if is_paused else "State: ACTIVE",
+                     (10, 113), 0.5, (0, 0, 255) if is_paused else GREEN, 1),
+                ))
+            
+                # Context (bottom-left)
+                # The summary only changes once a second; refresh it on the tick
+                now_s = int(time.monotonic())
+                if now_s != context_tick:
+                    context_tick = now_s
+                    context = context_manager.get_context_summary()
+                cv2.putText(frame, f"Time: {context['time_of_day']} | Session: {context['session_duration']}",
+                           (20, h - 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (150, 150, 150), 1)
+            
+                # Frame counter (bottom-right)
+                cv2.putText(frame, f"Frame: {frame_count}", (w - 120, h - 20),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (150, 150, 150), 1)
+            
+                pipeline.show(frame)
+            
+            key = pipeline.get_key()
             if key == ord('q'):
                 break
             elif key == ord('h'):
@@ -220,14 +275,20 @@ def main():
                 print("  ✋ Palm   -> Play/Resume")
                 print("  👍 Thumbs -> Like")
                 print("=" * 50 + "\n")
+
+    try:
+        pipeline.run(process)
     
     except KeyboardInterrupt:
         logger.info("Interrupted")
     finally:
         logger.info("Shutting down...")
+        pipeline.stop()
+        pool.shutdown(wait=True)
         gesture_recognizer.cleanup()
         camera.release()
-        cv2.destroyAllWindows()
+        if not headless:
+            cv2.destroyAllWindows()
         logger.info(f"Demo complete. Processed {frame_count} frames.")
 
 if __name__ == "__main__":
@@ -2,6 +2,7 @@
 import requests
 import time
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 print("\n=== OLLAMA DIAGNOSTIC (V4.7) ===")
 url = "http://localhost:11434/api/generate"
@@ -13,9 +14,18 @@ test_prompts = [
     "Q: Who are you?\nA:"
 ]
 
-for prompt in test_prompts:
-    print(f"\n[Test] Calling: {prompt.strip()}")
-    start = time.time()
+# Pooled keep-alive connections, reused across calls instead of a new TCP
+# connection per requests.post()
+session = requests.Session()
+
+# Requests are sent together; with the default OLLAMA_NUM_PARALLEL=1 each one
+# can wait behind all the others, so the timeout covers the whole batch
+TIMEOUT = 20 * len(test_prompts)
+
+def call(prompt):
+    """Run one prompt; returns the report lines so output stays in order."""
+    lines = [f"\n[Test] Calling: {prompt.strip()}"]
+    start = time.perf_counter()
     try:
         payload = {
             "model": model,
@@ -23,16 +33,32 @@ for prompt in test_prompts:
             "stream": False,
             "options": {"num_predict": 50, "temperature": 0.1}
         }
-        resp = requests.post(url, json=payload, timeout=20)
-        end = time.time()
+        resp = session.post(url, json=payload, timeout=TIMEOUT)
+        end = time.perf_counter()
         
         if resp.status_code == 200:
-            text = resp.json().get('response', '').strip()
-            print(f"  Result: {text}")
-            print(f"  Time: {end - start:.2f}s")
+            data = resp.json()
+            text = data.get('response', '').strip()
+            lines.append(f"  Result: {text}")
+            # Ollama's own timings exclude time spent queued behind the other prompts
+            compute_ns = data.get('prompt_eval_duration', 0) + data.get('eval_duration', 0)
+            lines.append(f"  Time: {compute_ns / 1e9:.2f}s generating, "
+                         f"{end - start:.2f}s wall (incl. queue wait)")
         else:
-            print(f"  Error {resp.status_code}: {resp.text}")
+            lines.append(f"  Error {resp.status_code}: {resp.text}")
     except Exception as e:
-        print(f"  Failed: {e}")
+        lines.append(f"  Failed: {e}")
+    return lines
+
+# Send all prompts at once: with OLLAMA_NUM_PARALLEL > 1 they run together,
+# otherwise Ollama queues them without a client round trip between each
+start_all = time.perf_counter()
+with ThreadPoolExecutor(max_workers=len(test_prompts)) as pool:
+    results = list(pool.map(call, test_prompts))
+
+for lines in results:
+    print("\n".join(lines))
+print(f"\nTotal wall time: {time.perf_counter() - start_all:.2f}s")
 
+session.close()
 print("\n=== DIAGNOSTIC COMPLETE ===")
@@ -1,24 +1,74 @@
-from flask import Flask, render_template_string, Response, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_socketio import SocketIO, emit
 import cv2
 import threading
 import time
 import os
+import hashlib
+
+# Optional: libjpeg-turbo bindings (SIMD DCT/Huffman), a few times cheaper than cv2.imencode
+HAS_TURBOJPEG = False
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJSAMP_420
+    _tj = TurboJPEG()
+    HAS_TURBOJPEG = True
+except (ImportError, OSError, RuntimeError):  # Module or libturbojpeg missing
+    pass
+
+# Optional: simplejpeg bundles libjpeg-turbo in its wheel (no system library needed)
+HAS_SIMPLEJPEG = False
+try:
+    import simplejpeg
+    HAS_SIMPLEJPEG = True
+except ImportError:
+    pass
+
+# Lower quality for higher FPS over network; 50% significantly reduces load on Pi
+# (dashboard.stream_quality overrides it through set_stream_quality)
+JPEG_QUALITY = 50
+
+# (quality factor, scale) steps picked from the clients' round-trip times.
+# Quality is a fraction of JPEG_QUALITY, so a fast link gets the configured
+# quality at full size and never more than that
+STREAM_LADDER = ((1.0, 1.0), (0.7, 0.75), (0.5, 0.5))
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'memo_secret'
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+# Server mode, from MEMO_ASYNC_MODE. 'threading' is the default because the
+# camera and perception threads block in native code, which would stall an
+# eventlet/gevent hub. Those modes serve many clients from one thread, but only
+# work if main.py monkey-patches the process before anything else is imported.
+ASYNC_MODE = os.environ.get("MEMO_ASYNC_MODE", "threading")
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=ASYNC_MODE)
 
 # Shared state
 output_frame = None
-lock = threading.Lock()
+# Guards output_frame; update_frame() wakes the encoder through it
+frame_cond = threading.Condition()
+# Latest encoded frame, shared by every stream client
+output_jpeg = None
+# Guards output_jpeg; the encoder wakes the streaming clients through it
+jpeg_cond = threading.Condition()
+_encoder_thread = None
+_encoder_lock = threading.Lock()
+# Connected stream clients (guarded by frame_cond); no viewers, no encoding
+_viewers = 0
+# Socket id -> (index into STREAM_LADDER, monotonic time of the last sample)
+_client_levels = {}
+_levels_lock = threading.Lock()
 scene_state_ref = None
+# Last stats payload pushed; replayed to each newly connected client
+_last_stats = None
 logs_queue = []
 
 def set_scene_state(state):
     global scene_state_ref
     scene_state_ref = state
 
+def set_stream_quality(quality):
+    global JPEG_QUALITY
+    JPEG_QUALITY = int(quality)
+
 def add_log(message, type="info"):
     global logs_queue
     timestamp = time.strftime("%H:%M:%S")
@@ -29,31 +79,168 @@ def add_log(message, type="info"):
     socketio.emit('new_log', log_entry)
 
 def update_frame(frame):
-    global output_frame
-    with lock:
-        output_frame = frame.copy()
+    """
+    Publish a frame to the MJPEG stream.
 
-def generate():
+    The array is kept by reference, not copied: callers hand over a fresh
+    buffer (e.g. a cv2.resize preview) and must not draw into it afterwards.
+    Already-encoded JPEG bytes are accepted too, see update_jpeg().
+    """
     global output_frame
+    with frame_cond:
+        output_frame = frame
+        frame_cond.notify_all()
+
+def has_viewers():
+    """True while at least one client is streaming; producers can skip publishing otherwise."""
+    return _viewers > 0
+
+def update_jpeg(jpeg_bytes):
+    """
+    Publish an already-encoded JPEG (e.g. from a hardware MJPEG encoder or an
+    MJPG camera stream); clients forward the bytes without re-encoding.
+    """
+    update_frame(bytes(jpeg_bytes))
+
+# Spelled out for cv2.imencode rather than left to the build's defaults: 4:2:0
+# chroma and no optimized-Huffman/progressive passes (both cost an extra scan).
+# getattr keeps older OpenCV builds, which lack some of the flags, working.
+_CV2_JPEG_PARAMS = []
+for _flag, _value in (("IMWRITE_JPEG_SAMPLING_FACTOR", "IMWRITE_JPEG_SAMPLING_FACTOR_420"),
+                      ("IMWRITE_JPEG_OPTIMIZE", 0),
+                      ("IMWRITE_JPEG_PROGRESSIVE", 0)):
+    if isinstance(_value, str):
+        _value = getattr(cv2, _value, None)
+    if hasattr(cv2, _flag) and _value is not None:
+        _CV2_JPEG_PARAMS += [int(getattr(cv2, _flag)), int(_value)]
+
+def _rtt_level(rtt_ms, current):
+    if rtt_ms < 100:
+        return 0
+    if rtt_ms < 250:
+        return 1
+    if rtt_ms > 400:
+        return 2
+    # 250-400 ms: hold the current step so the stream doesn't flap between them
+    return 1 if current is None else current
+
+# A client's step eases back one rung per this many seconds without a sample,
+# so one slow reading doesn't degrade the stream for good
+RTT_DECAY_S = 10.0
+
+def _current_level(level, sampled_at, now):
+    return max(level - int((now - sampled_at) / RTT_DECAY_S), 0)
+
+def _stream_settings():
+    """Quality and scale for the next encode, set by the slowest client."""
+    now = time.monotonic()
+    with _levels_lock:
+        level = max((_current_level(lv, t, now) for lv, t in _client_levels.values()),
+                    default=None)
+    if level is None:
+        return JPEG_QUALITY, 1.0
+    factor, scale = STREAM_LADDER[level]
+    return max(int(JPEG_QUALITY * factor), 1), scale
+
+def encode_jpeg(frame, quality=None):
+    """JPEG bytes for a BGR frame, or None if encoding failed."""
+    if quality is None:
+        quality = JPEG_QUALITY
+    if HAS_TURBOJPEG:
+        # PyTurboJPEG defaults to 4:2:2; 4:2:0 (cv2's default) halves the chroma again
+        return _tj.encode(frame, quality=quality, pixel_format=TJPF_BGR,
+                          jpeg_subsample=TJSAMP_420)
+    if HAS_SIMPLEJPEG:
+        return simplejpeg.encode_jpeg(frame, quality=quality, colorspace='BGR',
+                                      colorsubsampling='420', fastdct=True)
+    flag, encoded = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), quality] + _CV2_JPEG_PARAMS)
+    return encoded.tobytes() if flag else None
+
+def _encoder():
+    """Encode each published frame once and broadcast the bytes to all clients."""
+    global output_jpeg
+    last = None
+    last_error = None
     while True:
-        with lock:
-            if output_frame is None:
-                time.sleep(0.01)
-                continue
-            
-            # Use lower quality for higher FPS over network
-            # Encode with 50% quality to significantly reduce network load on Pi
-            (flag, encodedImage) = cv2.imencode(".jpg", output_frame, [int(cv2.IMWRITE_JPEG_QUALITY), 50])
-            if not flag:
+        # update_frame() swaps in a new array rather than writing into this
+        # one, so the reference can be encoded outside the lock
+        with frame_cond:
+            frame_cond.wait_for(
+                lambda: _viewers > 0 and output_frame is not None and output_frame is not last)
+            frame = output_frame
+        last = frame
+
+        if isinstance(frame, bytes):
+            jpeg = frame
+        else:
+            try:
+                # One encode is shared by every client, so it follows the slowest link
+                quality, scale = _stream_settings()
+                if scale < 1.0:
+                    frame = cv2.resize(frame, None, fx=scale, fy=scale,
+                                       interpolation=cv2.INTER_AREA)
+                jpeg = encode_jpeg(frame, quality)
+            except Exception as e:
+                # Skip the frame; this thread is the only encoder, so it must survive
+                if repr(e) != last_error:
+                    last_error = repr(e)
+                    print(f"[Dashboard] Frame encode failed: {e}")
                 continue
-        
-        yield(b'--frame\r\n' b'Content-Type: image/jpeg\r\n\r\n' + 
-              bytearray(encodedImage) + b'\r\n')
-        time.sleep(0.05) # Target ~20 FPS to save CPU on Pi
+        if jpeg is None:
+            continue
+        with jpeg_cond:
+            output_jpeg = jpeg
+            jpeg_cond.notify_all()
+
+def _task_alive(task):
+    # Threads have is_alive(); eventlet/gevent tasks expose `dead` instead
+    is_alive = getattr(task, "is_alive", None)
+    return is_alive() if is_alive else not getattr(task, "dead", False)
+
+def _ensure_encoder():
+    # Started by the first client, so nothing is encoded until someone watches;
+    # restarted if it ever exited, since every stream waits on it
+    global _encoder_thread
+    with _encoder_lock:
+        if _encoder_thread is None or not _task_alive(_encoder_thread):
+            _encoder_thread = socketio.start_background_task(_encoder)
 
-@app.route("/")
-def index():
-    return render_template_string("""
+def generate():
+    global _viewers
+    _ensure_encoder()
+    with frame_cond:
+        _viewers += 1
+        frame_cond.notify_all()
+    try:
+        yield from _stream()
+    finally:
+        # Runs when the server closes the generator after a disconnect
+        with frame_cond:
+            _viewers -= 1
+
+def _stream():
+    last_sent = None
+    while True:
+        # Sleep until the encoder publishes a JPEG this client hasn't sent; the
+        # stream runs at the producer's rate with no polling and no per-client encode
+        # No timeout: an idle scene costs no wakeups. A client that went away
+        # is only noticed on the next write anyway, so polling would not help.
+        with jpeg_cond:
+            jpeg_cond.wait_for(lambda: output_jpeg is not None and output_jpeg is not last_sent)
+            jpeg = output_jpeg
+        last_sent = jpeg
+
+        # Header, body and trailer go out as separate chunks so the JPEG is
+        # never copied into a concatenated part; Content-Length lets the
+        # client read the body without scanning for the boundary
+        yield (b'--frame\r\nContent-Type: image/jpeg\r\nContent-Length: '
+               + str(len(jpeg)).encode() + b'\r\n\r\n')
+        yield jpeg
+        yield b'\r\n'
+
+# The page is static (no Jinja constructs), so it is encoded once instead of
+# going through render_template_string per request; the ETag lets reloads 304
+INDEX_HTML = """
     <!DOCTYPE html>
     <html lang="en">
     <head>
@@ -385,9 +572,23 @@ def index():
                     const now = new Date();
                     document.getElementById('clock').innerText = now.toLocaleTimeString('en-US', { hour12: false });
                 }, 1000);
+                // Probe on a timer: stats only arrive when they change
+                setInterval(probeRtt, RTT_PROBE_MS);
+            }
+
+            // Round trip through the server's ack; reported back so the
+            // stream can trade quality and size for latency
+            const RTT_PROBE_MS = 2000;
+            function probeRtt() {
+                if (!socket.connected) return;
+                const sent = Date.now();
+                socket.emit('rtt_probe', () => {
+                    const rtt = Date.now() - sent;
+                    document.getElementById('ping').innerText = rtt;
+                    socket.emit('client_rtt', rtt);
+                });
             }
 
-            let lastPing = Date.now();
             socket.on('stats_update', (data) => {
                 const cpuRing = document.getElementById('cpu-ring');
                 const fpsRing = document.getElementById('fps-ring');
@@ -398,8 +599,6 @@ def index():
 
                 document.getElementById('cpu-val').innerText = data.cpu;
                 document.getElementById('fps-val').innerText = Math.round(data.fps);
-                document.getElementById('ping').innerText = Date.now() - lastPing;
-                lastPing = Date.now();
 
                 const userId = data.identity || (data.human_present ? "UNIDENTIFIED HUMAN" : "NO SUBJECT");
                 document.getElementById('cog-id').innerText = userId.toUpperCase();
@@ -441,7 +640,14 @@ def index():
         </script>
     </body>
     </html>
-    """)
+    """.encode()
+INDEX_ETAG = hashlib.md5(INDEX_HTML).hexdigest()
+
+@app.route("/")
+def index():
+    response = Response(INDEX_HTML, mimetype="text/html")
+    response.set_etag(INDEX_ETAG)
+    return response.make_conditional(request)
 
 @app.route("/video_feed")
 def video_feed():
@@ -456,27 +662,67 @@ def api_command():
         return jsonify({"status": "queued"})
     return jsonify({"status": "error"})
 
+@socketio.on('rtt_probe')
+def on_rtt_probe():
+    # The client times the acknowledgement
+    return True
+
+@socketio.on('client_rtt')
+def on_client_rtt(rtt_ms):
+    try:
+        rtt_ms = float(rtt_ms)
+    except (TypeError, ValueError):
+        return
+    with _levels_lock:
+        prev = _client_levels.get(request.sid)
+        now = time.monotonic()
+        current = _current_level(*prev, now) if prev else None
+        _client_levels[request.sid] = (_rtt_level(rtt_ms, current), now)
+
+@socketio.on('connect')
+def on_connect():
+    # Stats are only pushed on change, so a new page would otherwise stay
+    # blank until the scene changes
+    if _last_stats is not None:
+        emit('stats_update', _last_stats)
+
+@socketio.on('disconnect')
+def on_disconnect():
+    with _levels_lock:
+        _client_levels.pop(request.sid, None)
+
 def start_server():
     import logging
     log = logging.getLogger('werkzeug')
     log.setLevel(logging.ERROR)
     
     def stats_broadcaster():
+        global _last_stats
         while True:
             if scene_state_ref:
                 from core import get_perf_monitor
                 perf = get_perf_monitor()
                 stats = perf.get_stats()
-                socketio.emit('stats_update', {
+                payload = {
                     'human_present': scene_state_ref.human['present'],
                     'identity': scene_state_ref.human['identity'],
                     'focus_mode': scene_state_ref.focus_mode,
                     'objects': list(scene_state_ref.objects.keys()),
                     'cpu': stats['cpu'],
                     'fps': stats['fps']
-                })
-            time.sleep(0.5)
+                }
+                # Push only changes; an idle scene then costs no serialize/send
+                if payload != _last_stats:
+                    socketio.emit('stats_update', payload)
+                    _last_stats = payload
+            socketio.sleep(0.5)
             
-    threading.Thread(target=stats_broadcaster, daemon=True).start()
-    socketio.run(app, host="0.0.0.0", port=5000, debug=False, use_reloader=False, allow_unsafe_werkzeug=True)
+    # socketio.sleep / start_background_task map to time.sleep and a thread in
+    # threading mode, and to cooperative tasks under an async server
+    socketio.start_background_task(stats_broadcaster)
+    if ASYNC_MODE == 'threading':
+        socketio.run(app, host="0.0.0.0", port=5000, debug=False, use_reloader=False, allow_unsafe_werkzeug=True)
+    else:
+        # eventlet/gevent run their own WSGI server; the Werkzeug flag doesn't apply
+        socketio.run(app, host="0.0.0.0", port=5000, debug=False, use_reloader=False)
 
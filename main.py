@@ -27,6 +27,16 @@ load_dotenv() # Load variables from .env
 
 os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
 
+# MEMO_ASYNC_MODE=eventlet|gevent runs the dashboard on green threads; the
+# standard library has to be patched before anything below imports it
+_async_mode = os.environ.get("MEMO_ASYNC_MODE", "threading")
+if _async_mode == "eventlet":
+    import eventlet
+    eventlet.monkey_patch()
+elif _async_mode == "gevent":
+    from gevent import monkey
+    monkey.patch_all()
+
 import cv2
 import threading
 import time
@@ -45,6 +55,7 @@ from core import (
 # Component imports
 from camera_input import CameraSource
 from state import SceneState
+from utils import setup_logging
 from reasoning import RulesEngine
 
 from interface import QueryHandler
@@ -91,6 +102,7 @@ class MEMOApp:
         # Dashboard
         self.dashboard = self.config.get('enable_dashboard', True)
         self.dashboard_thread = None
+        self.dashboard_config = self.config.get('dashboard', {})
         
         # Register event handlers (CRITICAL: Required for commands to work!)
         self._setup_event_handlers()
@@ -201,9 +213,15 @@ class MEMOApp:
                 
                 # Use AI for witty distraction alert
                 if 'phone' in obj.lower():
-                    speak(self.personality.phone_alert())
+                    msg = self.personality.phone_alert()
+                    if msg:  # None = still cooling down from the last alert
+                        speak(msg)
                 else:
-                    speak(self.personality.generate(f"Distraction alert: {obj}", self.scene_state, "quick"))
+                    # Queue each sentence as it arrives so speech starts early
+                    for sentence in self.personality.generate_sentences(
+                        f"Distraction alert: {obj}", self.scene_state, "quick"
+                    ):
+                        speak(sentence)
                 self.last_tts_time = time.time()
     
     def _handle_quit(self):
@@ -227,12 +245,14 @@ class MEMOApp:
         try:
             from interface import dashboard
             dashboard.set_scene_state(self.scene_state)
+            dashboard.set_stream_quality(self.dashboard_config.get('stream_quality', 50))
             dash_thread = threading.Thread(target=dashboard.start_server, daemon=True)
             dash_thread.start()
             self.dashboard = dashboard
             print("[Dashboard] Started at http://localhost:5000")
         except Exception as e:
             print(f"[Dashboard] Init failed: {e}")
+            self.dashboard = None
     
     def _process_frame(self, frame) -> Optional[Dict[str, Any]]:
         """
@@ -576,16 +596,23 @@ class MEMOApp:
             # Handle triggers (Pass frame directly, it's still clean here)
             self._handle_triggers(frame)
             
+            # Dashboard update due (throttled), and only while someone is watching
+            dashboard_due = (self.dashboard and self.frame_count % 5 == 0
+                             and self.dashboard.has_viewers())
+            
             # Draw overlay only if needed (for display or dashboard update)
-            should_draw = self.show_display or (self.dashboard and self.frame_count % 5 == 0)
+            should_draw = self.show_display or dashboard_due
             if should_draw:
                 frame = self._draw_overlay(frame, perception_result)
             
-            # Update dashboard (throttled)
-            if self.dashboard and self.frame_count % 5 == 0:
+            # Update dashboard
+            if dashboard_due:
                 try:
-                    # Resize to optimized preview size for dashboard
-                    preview = cv2.resize(frame, (480, 270))
+                    # Resize to the stream height, keeping the camera's aspect
+                    # (encode cost and bandwidth scale with pixel count)
+                    fh, fw = frame.shape[:2]
+                    ph = min(self.dashboard_config.get('stream_height', 270), fh)
+                    preview = cv2.resize(frame, (fw * ph // fh, ph), interpolation=cv2.INTER_AREA)
                     self.dashboard.update_frame(preview)
                 except:
                     pass
@@ -619,6 +646,7 @@ class MEMOApp:
         # Cleanup
         print("\n[MEMO] Shutting down...")
         self.scene_state.save_memory()
+        self.personality.save_cache()
         cam.release()
         if self.show_display:
             cv2.destroyAllWindows()
@@ -642,6 +670,9 @@ def main():
         except ValueError:
             pass
     
+    # Console + log file for modules that log (personality, response cache)
+    setup_logging(level="INFO")
+    
     app = MEMOApp()
     try:
         app.run(source=source, rotation=rotation)
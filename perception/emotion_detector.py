@@ -1,11 +1,14 @@
 """
 Emotion Detection Module
-Uses FER (Facial Expression Recognition) library for accurate detection.
+Uses an INT8-quantized FER+ model through ONNX Runtime when available,
+otherwise the FER (Facial Expression Recognition) library.
 """
 
+import os
 import cv2
 import numpy as np
-from typing import Optional, Tuple, List, Dict
+from collections import Counter, deque
+from typing import Optional, Tuple, Dict, Deque
 from dataclasses import dataclass
 from enum import Enum
 
@@ -17,6 +20,20 @@ try:
 except ImportError:
     pass
 
+# Check for ONNX Runtime (quantized FER+ backend)
+HAS_ONNXRUNTIME = False
+try:
+    import onnxruntime
+    HAS_ONNXRUNTIME = True
+except ImportError:
+    pass
+
+# INT8 FER+ classifier; scripts/quantize_emotion_model.py produces it
+EMOTION_MODEL = os.path.join(os.path.dirname(__file__), "..", "models", "emotion-ferplus-int8.onnx")
+
+# FER+ output order; "contempt" has no Emotion member and maps to UNKNOWN
+FERPLUS_LABELS = ("neutral", "happy", "surprise", "sad", "angry", "disgust", "fear", "contempt")
+
 
 class Emotion(Enum):
     """Detected emotions."""
@@ -30,6 +47,30 @@ class Emotion(Enum):
     UNKNOWN = "unknown"
 
 
+# Lookup tables, built once rather than on every visualize/get_emoji call
+EMOTION_COLORS = {
+    Emotion.HAPPY: (0, 255, 100),      # Bright Green
+    Emotion.SAD: (255, 150, 0),        # Blue
+    Emotion.ANGRY: (0, 0, 255),        # Red
+    Emotion.SURPRISED: (0, 255, 255),  # Yellow
+    Emotion.NEUTRAL: (200, 200, 200),  # Gray
+    Emotion.FEAR: (255, 0, 150),       # Purple
+    Emotion.DISGUST: (0, 150, 0),      # Dark Green
+    Emotion.UNKNOWN: (128, 128, 128)
+}
+
+EMOTION_EMOJIS = {
+    Emotion.HAPPY: "😊",
+    Emotion.SAD: "😢",
+    Emotion.ANGRY: "😠",
+    Emotion.SURPRISED: "😲",
+    Emotion.NEUTRAL: "😐",
+    Emotion.FEAR: "😨",
+    Emotion.DISGUST: "🤢",
+    Emotion.UNKNOWN: "🤔"
+}
+
+
 @dataclass
 class EmotionResult:
     """Result of emotion detection."""
@@ -49,17 +90,32 @@ class EmotionDetector:
         self,
         min_face_size: int = 48,
         stability_frames: int = 5,
-        use_mtcnn: bool = False  # MTCNN is more accurate but slower
+        use_mtcnn: bool = False,  # MTCNN is more accurate but slower
+        model_path: str = EMOTION_MODEL
     ):
         self.min_face_size = min_face_size
         self.stability_frames = stability_frames
-        self.emotion_history: List[Emotion] = []
+        # Bounded: old entries fall off on append
+        self.emotion_history: Deque[Emotion] = deque(maxlen=stability_frames)
         self.stable_emotion: Optional[Emotion] = None
         
         self.detector = None
+        self.session = None
         self.backend = "none"
         
-        if HAS_FER:
+        # Quantized FER+ first: int8 weights, one small CPU forward pass per face
+        if HAS_ONNXRUNTIME and os.path.exists(model_path):
+            try:
+                self.session = onnxruntime.InferenceSession(
+                    model_path, providers=["CPUExecutionProvider"]
+                )
+                self.input_name = self.session.get_inputs()[0].name
+                self.backend = "onnx_int8"
+                print("Using quantized FER+ model (ONNX Runtime)")
+            except Exception as e:
+                print(f"ONNX emotion model failed: {e}")
+        
+        if HAS_FER and self.session is None:
             try:
                 # Initialize FER detector
                 # mtcnn=True is more accurate, mtcnn=False uses OpenCV (faster)
@@ -70,19 +126,58 @@ class EmotionDetector:
                 print(f"FER initialization failed: {e}")
         
         if self.detector is None:
-            # Fallback to basic OpenCV
+            # Face finding for the ONNX backend and the basic OpenCV fallback
             self.face_cascade = cv2.CascadeClassifier(
                 cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
             )
-            self.backend = "opencv_basic"
-            print("Using OpenCV Haar cascades (basic fallback)")
+            if self.session is None:
+                self.backend = "opencv_basic"
+                print("Using OpenCV Haar cascades (basic fallback)")
     
-    def detect(self, frame: np.ndarray) -> Optional[EmotionResult]:
-        """Detect emotion from the frame."""
-        if self.backend.startswith("fer"):
+    def detect(self, frame: np.ndarray, gray: Optional[np.ndarray] = None) -> Optional[EmotionResult]:
+        """Detect emotion from the frame (gray: optional precomputed grayscale copy)."""
+        if self.backend == "onnx_int8":
+            return self._detect_onnx(frame, gray)
+        elif self.backend.startswith("fer"):
             return self._detect_fer(frame)
         else:
-            return self._detect_opencv(frame)
+            return self._detect_opencv(frame, gray)
+    
+    def _detect_onnx(self, frame: np.ndarray, gray: Optional[np.ndarray] = None) -> Optional[EmotionResult]:
+        """Haar face box + quantized FER+ classifier."""
+        if gray is None:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        faces = self.face_cascade.detectMultiScale(
+            gray, scaleFactor=1.1, minNeighbors=5,
+            minSize=(self.min_face_size, self.min_face_size)
+        )
+        
+        if len(faces) == 0:
+            self._reset_stability()
+            return None
+        
+        x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
+        
+        # FER+ takes a 1x1x64x64 grayscale face with raw 0-255 values
+        face = cv2.resize(gray[y:y + h, x:x + w], (64, 64), interpolation=cv2.INTER_AREA)
+        scores = self.session.run(None, {self.input_name: face[None, None].astype(np.float32)})[0][0]
+        probs = np.exp(scores - scores.max())
+        probs /= probs.sum()
+        emotions = {label: float(p) for label, p in zip(FERPLUS_LABELS, probs)}
+        
+        dominant = max(emotions.items(), key=lambda x: x[1])
+        try:
+            emotion = Emotion(dominant[0])
+        except ValueError:
+            emotion = Emotion.UNKNOWN
+        emotion = self._update_stability(emotion)
+        
+        return EmotionResult(
+            emotion=emotion,
+            confidence=dominant[1],
+            face_bbox=(int(x), int(y), int(w), int(h)),
+            all_emotions=emotions
+        )
     
     def _detect_fer(self, frame: np.ndarray) -> Optional[EmotionResult]:
         """Detect emotion using FER library."""
@@ -130,9 +225,10 @@ class EmotionDetector:
             all_emotions=emotions
         )
     
-    def _detect_opencv(self, frame: np.ndarray) -> Optional[EmotionResult]:
+    def _detect_opencv(self, frame: np.ndarray, gray: Optional[np.ndarray] = None) -> Optional[EmotionResult]:
         """Basic fallback using OpenCV."""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if gray is None:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         faces = self.face_cascade.detectMultiScale(
             gray, scaleFactor=1.1, minNeighbors=5,
             minSize=(self.min_face_size, self.min_face_size)
@@ -158,13 +254,8 @@ class EmotionDetector:
         """Prevent emotion flickering with temporal smoothing."""
         self.emotion_history.append(emotion)
         
-        # Keep only recent history
-        if len(self.emotion_history) > self.stability_frames:
-            self.emotion_history.pop(0)
-        
         # Find most common emotion in history
         if len(self.emotion_history) >= 2:
-            from collections import Counter
             emotion_counts = Counter(self.emotion_history)
             most_common = emotion_counts.most_common(1)[0]
             
@@ -252,31 +343,11 @@ class EmotionDetector:
     
     def _get_emotion_color(self, emotion: Emotion) -> Tuple[int, int, int]:
         """Get BGR color for emotion."""
-        colors = {
-            Emotion.HAPPY: (0, 255, 100),      # Bright Green
-            Emotion.SAD: (255, 150, 0),        # Blue
-            Emotion.ANGRY: (0, 0, 255),        # Red
-            Emotion.SURPRISED: (0, 255, 255),  # Yellow
-            Emotion.NEUTRAL: (200, 200, 200),  # Gray
-            Emotion.FEAR: (255, 0, 150),       # Purple
-            Emotion.DISGUST: (0, 150, 0),      # Dark Green
-            Emotion.UNKNOWN: (128, 128, 128)
-        }
-        return colors.get(emotion, (255, 255, 255))
+        return EMOTION_COLORS.get(emotion, (255, 255, 255))
     
     def get_emoji(self, emotion: Emotion) -> str:
         """Get emoji for emotion."""
-        emojis = {
-            Emotion.HAPPY: "😊",
-            Emotion.SAD: "😢",
-            Emotion.ANGRY: "😠",
-            Emotion.SURPRISED: "😲",
-            Emotion.NEUTRAL: "😐",
-            Emotion.FEAR: "😨",
-            Emotion.DISGUST: "🤢",
-            Emotion.UNKNOWN: "🤔"
-        }
-        return emojis.get(emotion, "🤔")
+        return EMOTION_EMOJIS.get(emotion, "🤔")
     
     def cleanup(self):
         """Cleanup resources."""
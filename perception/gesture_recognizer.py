@@ -58,8 +58,14 @@ class GestureRecognizer:
         max_num_hands: int = 1,
         min_detection_confidence: float = 0.5,
         min_tracking_confidence: float = 0.5,
-        stability_frames: int = 3
+        stability_frames: int = 3,
+        device: str = "auto"
     ):
+        """
+        Args:
+            device: "cuda"/"mps" run MediaPipe on its GPU delegate (falling back
+                    to CPU if that fails); "auto" and "cpu" stay on CPU
+        """
         self.stability_frames = stability_frames
         self.gesture_history: List[Gesture] = []
         self.stable_gesture: Optional[Gesture] = None
@@ -84,15 +90,24 @@ class GestureRecognizer:
                 # Download model if not exists
                 model_path = self._get_model_path()
                 if model_path:
-                    base_options = mp_python.BaseOptions(model_asset_path=model_path)
-                    options = mp_vision.HandLandmarkerOptions(
-                        base_options=base_options,
-                        running_mode=mp_vision.RunningMode.IMAGE,
-                        num_hands=max_num_hands,
-                        min_hand_detection_confidence=min_detection_confidence,
-                        min_tracking_confidence=min_tracking_confidence
-                    )
-                    self.detector = mp_vision.HandLandmarker.create_from_options(options)
+                    Delegate = mp_python.BaseOptions.Delegate
+                    delegates = [Delegate.GPU, Delegate.CPU] if device in ("cuda", "mps") else [Delegate.CPU]
+                    for delegate in delegates:
+                        base_options = mp_python.BaseOptions(model_asset_path=model_path, delegate=delegate)
+                        options = mp_vision.HandLandmarkerOptions(
+                            base_options=base_options,
+                            running_mode=mp_vision.RunningMode.IMAGE,
+                            num_hands=max_num_hands,
+                            min_hand_detection_confidence=min_detection_confidence,
+                            min_tracking_confidence=min_tracking_confidence
+                        )
+                        try:
+                            self.detector = mp_vision.HandLandmarker.create_from_options(options)
+                            break
+                        except Exception as e:
+                            if delegate == Delegate.CPU:
+                                raise
+                            print(f"MediaPipe GPU delegate unavailable ({e}), using CPU")
                     self.backend = "mediapipe_tasks"
                     print("Using MediaPipe Tasks API (accurate)")
             except Exception as e:
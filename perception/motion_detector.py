@@ -8,6 +8,11 @@ import numpy as np
 from typing import Optional, Tuple, List
 from dataclasses import dataclass
 
+# Optional: JIT-compiled diff+threshold kernels
+from .motion_kernels import HAS_NUMBA
+if HAS_NUMBA:
+    from . import motion_kernels
+
 
 @dataclass
 class MotionRegion:
@@ -30,7 +35,11 @@ class MotionDetector:
         threshold: int = 25,
         min_area: int = 500,
         history: int = 20,
-        use_mog2: bool = False
+        use_mog2: bool = False,
+        scale: float = 1.0,
+        use_numba: bool = False,
+        three_frame: bool = False,
+        max_regions: Optional[int] = None
     ):
         """
         Initialize motion detector.
@@ -40,11 +49,29 @@ class MotionDetector:
             min_area: Minimum contour area to consider as motion
             history: Number of frames for MOG2 background model
             use_mog2: Use MOG2 (slower but more accurate) vs simple diff
+            scale: Downscale factor applied before detection (e.g. 0.5);
+                   min_area and returned regions stay in full-frame pixels
+            use_numba: Use the numba diff kernel for the simple method if
+                       numba is installed (ignored otherwise)
+            three_frame: Simple method only: require change across two
+                         consecutive frame pairs (fewer lighting false positives)
+            max_regions: Return at most this many regions, largest first
+                         (None = all); the motion score still counts every one
         """
         self.threshold = threshold
         self.min_area = min_area
+        self.scale = scale
         self.prev_frame: Optional[np.ndarray] = None
         self.use_mog2 = use_mog2
+        self.use_numba = use_numba and HAS_NUMBA
+        self._thresh_buf: Optional[np.ndarray] = None
+        self._mask_bufs: List[np.ndarray] = []
+        self.three_frame = three_frame
+        self.max_regions = max_regions
+        self._prev_mask: Optional[np.ndarray] = None
+        
+        if self.use_numba:
+            motion_kernels.warm_up(threshold)
         
         if use_mog2:
             # MOG2 background subtractor (more accurate but slower)
@@ -56,24 +83,51 @@ class MotionDetector:
         else:
             self.bg_subtractor = None
     
-    def detect(self, frame: np.ndarray) -> Tuple[bool, float, List[MotionRegion]]:
+    def detect(
+        self,
+        frame: np.ndarray,
+        gray: Optional[np.ndarray] = None
+    ) -> Tuple[bool, float, List[MotionRegion]]:
         """
         Detect motion in the current frame.
         
         Args:
             frame: Current BGR frame
+            gray: Grayscale version of frame, if the caller already has one
+                  (skips the internal cvtColor; the MOG2 method uses frame)
             
         Returns:
             Tuple of (motion_detected, motion_score, motion_regions)
         """
+        if self.scale == 1.0:
+            return self._detect_mog2(frame) if self.use_mog2 else self._detect_simple(frame, gray)
+        
+        # Diff a smaller image (INTER_AREA keeps the pixel distribution, so the
+        # threshold still applies) and map the regions back to frame coordinates
         if self.use_mog2:
-            return self._detect_mog2(frame)
+            small = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+            detected, score, regions = self._detect_mog2(small)
+        elif gray is not None:
+            small = cv2.resize(gray, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+            detected, score, regions = self._detect_simple(small, small)
         else:
-            return self._detect_simple(frame)
+            small = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+            detected, score, regions = self._detect_simple(small)
+        inv = 1.0 / self.scale
+        regions = [
+            MotionRegion(int(r.x * inv), int(r.y * inv), int(r.width * inv), int(r.height * inv), r.score)
+            for r in regions
+        ]
+        return detected, score, regions
     
-    def _detect_simple(self, frame: np.ndarray) -> Tuple[bool, float, List[MotionRegion]]:
+    def _detect_simple(
+        self,
+        frame: np.ndarray,
+        gray: Optional[np.ndarray] = None
+    ) -> Tuple[bool, float, List[MotionRegion]]:
         """Simple frame differencing method (fast)."""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if gray is None:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         gray = cv2.GaussianBlur(gray, (21, 21), 0)
         
         # First frame initialization
@@ -82,43 +136,45 @@ class MotionDetector:
             return False, 0.0, []
         
         # Compute frame difference
-        frame_diff = cv2.absdiff(self.prev_frame, gray)
-        thresh = cv2.threshold(frame_diff, self.threshold, 255, cv2.THRESH_BINARY)[1]
+        fused = False
+        if self.use_numba:
+            if self._thresh_buf is None or self._thresh_buf.shape != gray.shape:
+                self._thresh_buf = np.empty_like(gray)
+                self._mask_bufs = [np.empty_like(gray), np.empty_like(gray)]
+                self._prev_mask = None
+            if self.three_frame and self._prev_mask is not None:
+                # Diff, threshold and AND in one pass; the pair's mask goes to
+                # whichever buffer isn't holding the previous one
+                mask = self._mask_bufs[self._prev_mask is self._mask_bufs[0]]
+                motion_kernels.diff_thresh_and(gray, self.prev_frame, self.threshold,
+                                               self._prev_mask, mask, self._thresh_buf)
+                self._prev_mask = mask
+                fused = True
+            else:
+                motion_kernels.diff_thresh(gray, self.prev_frame, self.threshold, self._thresh_buf)
+            thresh = self._thresh_buf
+        else:
+            frame_diff = cv2.absdiff(self.prev_frame, gray)
+            thresh = cv2.threshold(frame_diff, self.threshold, 255, cv2.THRESH_BINARY)[1]
+        
+        # Three-frame differencing: keep pixels that changed in both the previous
+        # pair (f0, f1) and this one (f1, f2). The previous pair's mask is kept
+        # instead of a third frame, so this costs one bitwise_and per frame.
+        if self.three_frame and not fused:
+            prev_mask = self._prev_mask
+            self._prev_mask = thresh.copy() if thresh is self._thresh_buf else thresh
+            if prev_mask is None:
+                self.prev_frame = gray
+                return False, 0.0, []
+            thresh = cv2.bitwise_and(thresh, prev_mask)
         
         # Dilate to fill holes
         thresh = cv2.dilate(thresh, None, iterations=2)
         
-        # Find contours
-        contours, _ = cv2.findContours(
-            thresh.copy(),
-            cv2.RETR_EXTERNAL,
-            cv2.CHAIN_APPROX_SIMPLE
-        )
-        
-        # Analyze motion
-        motion_regions = []
-        total_motion_pixels = 0
-        
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            if area < self.min_area:
-                continue
-            
-            x, y, w, h = cv2.boundingRect(contour)
-            total_motion_pixels += area
-            
-            # Calculate motion score for this region
-            score = min(area / (frame.shape[0] * frame.shape[1]), 1.0)
-            motion_regions.append(MotionRegion(x, y, w, h, score))
-        
-        # Overall motion score (percentage of frame with motion)
-        motion_score = total_motion_pixels / (frame.shape[0] * frame.shape[1])
-        motion_detected = motion_score > 0.01  # 1% of frame
-        
         # Update previous frame
         self.prev_frame = gray
         
-        return motion_detected, motion_score, motion_regions
+        return self._analyze_mask(thresh)
     
     def _detect_mog2(self, frame: np.ndarray) -> Tuple[bool, float, List[MotionRegion]]:
         """MOG2 background subtraction method (more accurate)."""
@@ -130,37 +186,45 @@ class MotionDetector:
         thresh = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, np.ones((3, 3), np.uint8))
         thresh = cv2.dilate(thresh, None, iterations=2)
         
-        # Find contours
+        return self._analyze_mask(thresh)
+    
+    def _analyze_mask(self, mask: np.ndarray) -> Tuple[bool, float, List[MotionRegion]]:
+        """Turn a binary motion mask into (detected, score, regions), largest region first."""
+        # Find contours (OpenCV >= 3.2 leaves the input untouched, no copy needed)
         contours, _ = cv2.findContours(
-            thresh.copy(),
+            mask,
             cv2.RETR_EXTERNAL,
             cv2.CHAIN_APPROX_SIMPLE
         )
         
-        # Analyze motion
-        motion_regions = []
-        total_motion_pixels = 0
+        frame_area = mask.shape[0] * mask.shape[1]
+        min_area = self.min_area * self.scale * self.scale
         
+        # Every contour above min_area counts toward the score...
+        areas = []
         for contour in contours:
             area = cv2.contourArea(contour)
-            if area < self.min_area:
-                continue
-            
+            if area >= min_area:
+                areas.append((area, contour))
+        total_motion_pixels = sum(area for area, _ in areas)
+        
+        # ...but only the largest max_regions become MotionRegion objects
+        areas.sort(key=lambda item: item[0], reverse=True)
+        motion_regions = []
+        for area, contour in areas[:self.max_regions]:
             x, y, w, h = cv2.boundingRect(contour)
-            total_motion_pixels += area
-            
-            score = min(area / (frame.shape[0] * frame.shape[1]), 1.0)
-            motion_regions.append(MotionRegion(x, y, w, h, score))
+            motion_regions.append(MotionRegion(x, y, w, h, min(area / frame_area, 1.0)))
         
-        # Overall motion score
-        motion_score = total_motion_pixels / (frame.shape[0] * frame.shape[1])
-        motion_detected = motion_score > 0.01
+        # Overall motion score (percentage of frame with motion)
+        motion_score = total_motion_pixels / frame_area
+        motion_detected = motion_score > 0.01  # 1% of frame
         
         return motion_detected, motion_score, motion_regions
     
     def reset(self) -> None:
         """Reset the motion detector state."""
         self.prev_frame = None
+        self._prev_mask = None
         if self.bg_subtractor:
             # Recreate background subtractor
             self.bg_subtractor = cv2.createBackgroundSubtractorMOG2(
@@ -169,18 +233,30 @@ class MotionDetector:
                 detectShadows=False
             )
     
-    def visualize(self, frame: np.ndarray, regions: List[MotionRegion]) -> np.ndarray:
+    def visualize(
+        self,
+        frame: np.ndarray,
+        regions: List[MotionRegion],
+        dst: Optional[np.ndarray] = None
+    ) -> np.ndarray:
         """
         Draw motion regions on frame for debugging.
         
         Args:
             frame: Original frame
             regions: List of detected motion regions
+            dst: Buffer to draw into (pass frame itself to draw in place);
+                 defaults to a fresh copy of frame
             
         Returns:
             Frame with motion regions drawn
         """
-        vis_frame = frame.copy()
+        if dst is None:
+            vis_frame = frame.copy()
+        else:
+            if dst is not frame:
+                np.copyto(dst, frame)
+            vis_frame = dst
         
         for region in regions:
             # Draw bounding box
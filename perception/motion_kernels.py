@@ -0,0 +1,44 @@
+"""
+Motion Detection Kernels
+Numba-compiled per-pixel passes for MotionDetector's simple method.
+Each kernel fuses what would be several OpenCV/NumPy passes into one loop,
+parallelized over rows. Only defined when numba is installed.
+"""
+
+import numpy as np
+
+HAS_NUMBA = False
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    pass
+
+
+if HAS_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def diff_thresh(cur, prev, thresh, out):
+        """Fused absdiff + binary threshold: out = 255 where |cur - prev| > thresh."""
+        for i in prange(cur.shape[0]):
+            for j in range(cur.shape[1]):
+                d = abs(np.int16(cur[i, j]) - np.int16(prev[i, j]))
+                out[i, j] = 255 if d > thresh else 0
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def diff_thresh_and(cur, prev, thresh, prev_mask, mask, out):
+        """
+        Three-frame variant: writes this pair's mask to `mask` and its AND
+        with the previous pair's mask to `out`, in the same pass.
+        """
+        for i in prange(cur.shape[0]):
+            for j in range(cur.shape[1]):
+                d = abs(np.int16(cur[i, j]) - np.int16(prev[i, j]))
+                m = 255 if d > thresh else 0
+                mask[i, j] = m
+                out[i, j] = m & prev_mask[i, j]
+
+    def warm_up(thresh):
+        """Compile both kernels now so the first real frame isn't stalled by the JIT."""
+        a = np.zeros((1, 1), dtype=np.uint8)
+        diff_thresh(a, a, thresh, a.copy())
+        diff_thresh_and(a, a, thresh, a, a.copy(), a.copy())
@@ -191,7 +191,8 @@ class RulesEngine:
                 msg = self.personality.posture_reminder('sitting')
             else:
                 msg = "You have been sitting for a while. Time to stretch and move around!"
-            events.append(f"TTS: {msg}")
+            if msg:  # None = suppressed by the personality's alert debounce
+                events.append(f"TTS: {msg}")
             self.last_posture_alert = timestamp
             
         elif current_pose == 'standing' and duration > self.config.standing_reminder:
@@ -199,7 +200,8 @@ class RulesEngine:
                 msg = self.personality.posture_reminder('standing')
             else:
                 msg = "You have been standing for a while. You can take a seat now."
-            events.append(f"TTS: {msg}")
+            if msg:  # None = suppressed by the personality's alert debounce
+                events.append(f"TTS: {msg}")
             self.last_posture_alert = timestamp
         
         return events
@@ -286,7 +288,8 @@ class RulesEngine:
                     msg = self.personality.proximity_alert()
                 else:
                     msg = "You are too close to the screen. Please move back a bit."
-                events.append(f"TTS: {msg}")
+                if msg:  # None = suppressed by the personality's alert debounce
+                    events.append(f"TTS: {msg}")
                 self.last_proximity_alert = timestamp
         
         return events
@@ -0,0 +1,99 @@
+
+import os
+import sys
+import urllib.request
+
+# FP32 FER+ emotion classifier from the ONNX model zoo
+FERPLUS_URL = "https://github.com/onnx/models/raw/main/validated/vision/body_analysis/emotion_ferplus/model/emotion-ferplus-8.onnx"
+
+def quantize(src=None, faces_dir=None):
+    print("=== FER+ Emotion Model Quantizer ===")
+
+    try:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+    except ImportError:
+        print("onnxruntime is not installed: pip install onnxruntime")
+        return False
+
+    models_dir = os.path.join(os.path.dirname(__file__), "..", "models")
+    os.makedirs(models_dir, exist_ok=True)
+    dst = os.path.join(models_dir, "emotion-ferplus-int8.onnx")
+
+    # 1. FP32 source model
+    if src is None:
+        src = os.path.join(models_dir, "emotion-ferplus-8.onnx")
+        if not os.path.exists(src):
+            print("Downloading FER+ model...")
+            urllib.request.urlretrieve(FERPLUS_URL, src)
+
+    # 2. Dynamic 8-bit quantization, activations quantized at run time. The
+    #    model is mostly convolutions, which become ConvInteger; older CPU
+    #    providers only implement that for uint8 weights, so QUInt8, not QInt8
+    print(f"Quantizing {src} -> {dst}")
+    quantize_dynamic(src, dst, weight_type=QuantType.QUInt8)
+
+    before, after = os.path.getsize(src), os.path.getsize(dst)
+    print(f"Done: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB")
+
+    # 3. The detector silently falls back to FER if the model won't load, so
+    #    load it here and compare it against the FP32 model
+    if not validate(src, dst, faces_dir):
+        os.remove(dst)
+        print(f"Removed {dst}")
+        return False
+    return True
+
+def load_samples(faces_dir=None, count=32):
+    """1x1x64x64 float32 inputs: face crops from faces_dir, else random images."""
+    import numpy as np
+
+    if faces_dir:
+        import cv2
+        samples = []
+        for name in sorted(os.listdir(faces_dir)):
+            img = cv2.imread(os.path.join(faces_dir, name), cv2.IMREAD_GRAYSCALE)
+            if img is not None:
+                face = cv2.resize(img, (64, 64), interpolation=cv2.INTER_AREA)
+                samples.append(face[None, None].astype(np.float32))
+        if samples:
+            return samples
+        print(f"No readable images in {faces_dir}; using random inputs")
+
+    rng = np.random.default_rng(0)
+    return [rng.uniform(0, 255, (1, 1, 64, 64)).astype(np.float32) for _ in range(count)]
+
+def validate(src, dst, faces_dir=None, min_agreement=0.9):
+    """Load the quantized model and check its top-1 labels against the FP32 model."""
+    import numpy as np
+    import onnxruntime
+
+    try:
+        fp32 = onnxruntime.InferenceSession(src, providers=["CPUExecutionProvider"])
+        int8 = onnxruntime.InferenceSession(dst, providers=["CPUExecutionProvider"])
+    except Exception as e:
+        print(f"Quantized model does not load: {e}")
+        return False
+
+    name = fp32.get_inputs()[0].name
+    samples = load_samples(faces_dir)
+    agree = 0
+    max_diff = 0.0
+    for x in samples:
+        a = fp32.run(None, {name: x})[0][0]
+        b = int8.run(None, {int8.get_inputs()[0].name: x})[0][0]
+        agree += int(np.argmax(a) == np.argmax(b))
+        max_diff = max(max_diff, float(np.max(np.abs(a - b))))
+
+    rate = agree / len(samples)
+    kind = "face crops" if faces_dir else "random inputs (pass a face crop directory for a real check)"
+    print(f"Top-1 agreement with FP32: {rate:.0%} over {len(samples)} {kind}; max score diff {max_diff:.3f}")
+    if rate < min_agreement:
+        print(f"Agreement below {min_agreement:.0%}; not using the quantized model")
+        return False
+    return True
+
+if __name__ == "__main__":
+    # Usage: quantize_emotion_model.py [fp32_model.onnx] [face_crops_dir]
+    ok = quantize(sys.argv[1] if len(sys.argv) > 1 else None,
+                  sys.argv[2] if len(sys.argv) > 2 else None)
+    sys.exit(0 if ok else 1)
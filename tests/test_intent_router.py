@@ -0,0 +1,25 @@
+"""Tests for core.intent_router that need no ONNX model on disk."""
+
+import pytest
+
+from core.intent_router import IntentRouter
+
+
+def test_missing_model_dir_disables_the_router(tmp_path):
+    router = IntentRouter(model_dir=str(tmp_path))
+    assert not router.enabled
+    assert router.classify("explain gravity") is None
+
+
+def test_classify_picks_the_nearest_centroid_above_threshold(tmp_path, monkeypatch):
+    np = pytest.importorskip("numpy")
+    router = IntentRouter(model_dir=str(tmp_path), threshold=0.5)
+    router.enabled = True
+    router._labels = ("fact", "chat")
+    router._centroids = np.eye(2, dtype=np.float32)
+    vectors = {"explain gravity": [0.9, 0.1], "hmm": [0.3, 0.3]}
+    monkeypatch.setattr(router, "_encode_batch",
+                        lambda texts: np.array([vectors[texts[0]]], dtype=np.float32))
+
+    assert router.classify("explain gravity") == "fact"
+    assert router.classify("hmm") is None
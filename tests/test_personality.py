@@ -0,0 +1,144 @@
+"""Tests for core.personality that run without network or LLM backends."""
+
+import sys
+import types
+from unittest import mock
+
+import pytest
+
+from core import personality
+from core.personality import AIPersonality
+
+
+def _ai(**attrs):
+    """An AIPersonality built without __init__ (no backend probing), with `attrs` set."""
+    ai = AIPersonality.__new__(AIPersonality)
+    for name, value in attrs.items():
+        setattr(ai, name, value)
+    return ai
+
+
+@pytest.fixture
+def fake_requests(monkeypatch):
+    """A stand-in `requests` package (with `requests.adapters`) in sys.modules."""
+    requests = types.ModuleType("requests")
+    requests.Session = mock.MagicMock(name="Session")
+    adapters = types.ModuleType("requests.adapters")
+    adapters.HTTPAdapter = mock.MagicMock(name="HTTPAdapter")
+    requests.adapters = adapters
+    monkeypatch.setitem(sys.modules, "requests", requests)
+    monkeypatch.setitem(sys.modules, "requests.adapters", adapters)
+    personality._get_requests.cache_clear()
+    yield requests
+    personality._get_requests.cache_clear()
+
+
+def test_http_session_is_built_once(fake_requests):
+    ai = _ai(_session=None, max_parallel=3)
+
+    session = ai._http
+
+    assert session is fake_requests.Session.return_value
+    assert ai._http is session
+    fake_requests.Session.assert_called_once_with()
+    fake_requests.adapters.HTTPAdapter.assert_called_once_with(
+        pool_connections=1, pool_maxsize=4, max_retries=0
+    )
+    session.mount.assert_called_once_with('http://', fake_requests.adapters.HTTPAdapter.return_value)
+
+
+def _ollama_ai(model="phi3:mini", gguf=None, key=None):
+    return _ai(backend='ollama', _ollama_base='http://localhost:11434', ollama_model=model,
+               gemini_key=key, llama_gguf=gguf, active_model='gemini-1.5-flash')
+
+
+def test_backend_cache_requires_matching_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(personality, "BACKEND_CACHE_PATH", tmp_path / "backend.json")
+    saved = _ollama_ai(key="secret")
+    saved._save_backend(saved._backend_config_key())
+    assert "secret" not in (tmp_path / "backend.json").read_text()
+
+    same = _ollama_ai(key="secret")
+    assert same._restore_backend(same._backend_config_key())
+    for changed in (_ollama_ai(model="llama3", key="secret"),
+                    _ollama_ai(gguf="m.gguf", key="secret"),
+                    _ollama_ai(key="other")):
+        assert not changed._restore_backend(changed._backend_config_key())
+
+
+def _bare_ai():
+    return _ai(_inflight={}, _inflight_lock=personality.threading.Lock(), _recent={},
+               _tls=personality.threading.local())
+
+
+def test_debounce_skips_throttle_and_fallback_replies(monkeypatch):
+    ai = _bare_ai()
+    replies = iter(["Just a sec, thinking...", "Forty-two."])
+
+    def fake_generate(prompt, scene_state, response_type):
+        reply = next(replies)
+        ai._fell_back = reply.startswith("Just a sec")
+        return reply
+
+    monkeypatch.setattr(ai, "_generate", fake_generate)
+    assert ai.generate("meaning of life") == "Just a sec, thinking..."
+    assert not ai._recent
+    assert ai.generate("meaning of life") == "Forty-two."
+    assert ai.generate("meaning of life") == "Forty-two."  # served from the debounce
+
+
+def test_rank_models_lists_each_model_once():
+    available = {"models/gemini-2.0-flash", "models/gemini-1.5-flash"}
+    assert personality._rank_models(available) == ["gemini-2.0-flash", "gemini-1.5-flash"]
+
+
+def test_parallel_404s_advance_the_model_queue_once():
+    ai = _bare_ai()
+    ai._genai = None
+    ai.active_model = "gemini-2.0-flash"
+    ai._model_queue = ["gemini-1.5-flash", "gemini-1.5-pro"]
+    not_found = RuntimeError("404 model not found")
+
+    assert ai._next_gemini_model(not_found, "gemini-2.0-flash")
+    assert ai._next_gemini_model(not_found, "gemini-2.0-flash")  # stale failure: just retry
+    assert ai.active_model == "gemini-1.5-flash"
+    assert ai._model_queue == ["gemini-1.5-pro"]
+
+
+def _gemini_ai(create_error=None):
+    ai = _bare_ai()
+    ai.active_model = "gemini-2.0-flash"
+    ai._gemini_caches = {}
+    ai._gemini_cache_retry_at = 0.0
+    ai._gemini_client = mock.MagicMock()
+    ai._gemini_client.caches.create.side_effect = create_error
+    return ai
+
+
+def test_short_system_prompt_is_sent_inline_without_a_cache_call():
+    ai = _gemini_ai()
+    assert ai._gemini_config("short") == {"system_instruction": "short"}
+    ai._gemini_client.caches.create.assert_not_called()
+
+
+def test_transient_cache_error_is_retried_but_refusal_is_final():
+    long_system = "x" * (personality.GEMINI_CACHE_MIN_TOKENS * 4)
+
+    ai = _gemini_ai(RuntimeError("503 UNAVAILABLE"))
+    assert ai._gemini_config(long_system) == {"system_instruction": long_system}
+    assert ai._gemini_cache_retry_at != float('inf')
+
+    ai = _gemini_ai(RuntimeError("400 Cached content is too small"))
+    ai._gemini_config(long_system)
+    assert ai._gemini_cache_retry_at == float('inf')
+
+
+def test_intent_is_detected_once_per_request(monkeypatch):
+    ai = _bare_ai()
+    ai._generate_lock = personality.threading.Lock()
+    ai.conversation = personality.Conversation()
+    calls = []
+    monkeypatch.setattr(ai, "detect_intent", lambda q: calls.append(q) or "datetime")
+
+    assert ai._generate("What time is it", None, "quick")
+    assert calls == ["what time is it"]
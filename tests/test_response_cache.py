@@ -0,0 +1,70 @@
+"""Tests for core.response_cache (exact tier only; no embedding model needed)."""
+
+import pytest
+
+from core.response_cache import ResponseCache
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache(capacity=3, semantic=False)
+
+
+def test_exact_hit_is_scoped_by_context_and_type(cache):
+    cache.put("ctx", "what is rust", "A language.")
+
+    assert cache.get("ctx", "what is rust") == "A language."
+    assert cache.get("other ctx", "what is rust") is None
+    assert cache.get("ctx", "what is rust", response_type="detailed") is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_prompt_is_normalized(cache):
+    cache.put("ctx", "  What   IS rust\n", "A language.")
+    assert cache.get("ctx", "what is RUST") == "A language."
+
+
+def test_empty_response_is_not_stored(cache):
+    cache.put("ctx", "hello", "")
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    for prompt in ("a", "b", "c"):
+        cache.put("ctx", prompt, prompt.upper())
+    assert cache.get("ctx", "a") == "A"  # "b" is now the oldest
+
+    cache.put("ctx", "d", "D")
+
+    assert len(cache) == 3
+    assert cache.get("ctx", "b") is None
+    assert [cache.get("ctx", p) for p in ("a", "c", "d")] == ["A", "C", "D"]
+
+
+def test_save_and_load_round_trip(cache, tmp_path):
+    path = str(tmp_path / "nested" / "cache.pkl")
+    cache.put("ctx", "a", "A")
+    cache.put("ctx", "b", "B")
+    cache.save(path)
+
+    restored = ResponseCache(capacity=1, semantic=False)
+    restored.load(path)
+
+    assert len(restored) == 1  # trimmed to capacity, newest kept
+    assert restored.get("ctx", "b") == "B"
+
+
+def test_load_ignores_missing_file(cache, tmp_path):
+    cache.put("ctx", "a", "A")
+    cache.load(str(tmp_path / "missing.pkl"))
+    assert cache.get("ctx", "a") == "A"
+
+
+def test_load_ignores_corrupt_file(cache, tmp_path):
+    path = tmp_path / "cache.pkl"
+    path.write_bytes(b"not a pickle")
+    cache.put("ctx", "a", "A")
+
+    cache.load(str(path))
+
+    assert cache.get("ctx", "a") == "A"
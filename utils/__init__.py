@@ -5,6 +5,8 @@ Provides logging, error handling, and helper functions.
 
 from .logger import get_logger, setup_logging
 from .exceptions import MEMOException, CameraError, ModelError, HardwareError
+from .overlay import TextPanel, put_lines, YELLOW, GREEN, GRAY, DIM
+from .demo_controls import DemoState, KEY_HANDLERS
 
 __all__ = [
     'get_logger',
@@ -12,5 +14,13 @@ __all__ = [
     'MEMOException',
     'CameraError',
     'ModelError',
-    'HardwareError'
+    'HardwareError',
+    'TextPanel',
+    'put_lines',
+    'YELLOW',
+    'GREEN',
+    'GRAY',
+    'DIM',
+    'DemoState',
+    'KEY_HANDLERS'
 ]
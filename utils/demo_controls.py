@@ -0,0 +1,76 @@
+"""
+MEMO Demo Controls
+Keyboard handlers shared by the feature demos.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+
+@dataclass
+class DemoState:
+    """What the key handlers can read and change."""
+    log: Callable[..., None]  # log(level, msg, *args)
+    config: Any
+    motion_detector: Any = None
+    context_manager: Any = None
+    motion_enabled: bool = True
+    context_summary: Dict[str, str] = field(default_factory=dict)
+    user_name: str = "Jayadeep"
+
+
+def _on_quit(state: DemoState) -> Optional[str]:
+    state.log('info', "User requested quit")
+    return 'quit'
+
+
+def _on_toggle_motion(state: DemoState) -> None:
+    state.motion_enabled = not state.motion_enabled
+    state.config.perception.enable_motion = state.motion_enabled
+    state.log('info', "Motion detection: %s", 'ON' if state.motion_enabled else 'OFF')
+
+
+def _on_reset(state: DemoState) -> None:
+    if state.motion_detector:
+        state.motion_detector.reset()
+        state.log('info', "Motion detector reset")
+
+
+def _on_greet(state: DemoState) -> None:
+    if state.context_manager:
+        greeting = state.context_manager.get_greeting(state.user_name)
+        if greeting:
+            state.log('info', "🗣️  %s", greeting)
+            print(f"\n{greeting}\n")
+
+
+def _on_show_ctx(state: DemoState) -> None:
+    if state.context_summary:
+        print("\n" + "=" * 40)
+        print("Context Summary:")
+        for key, value in state.context_summary.items():
+            print(f"  {key}: {value}")
+        print("=" * 40 + "\n")
+
+
+def _on_help(state: DemoState) -> None:
+    print("\n" + "=" * 60)
+    print("Keyboard Controls:")
+    print("  q - Quit")
+    print("  m - Toggle motion detection")
+    print("  r - Reset motion detector")
+    print("  g - Force greeting")
+    print("  c - Show context summary")
+    print("  h - Show this help")
+    print("=" * 60 + "\n")
+
+
+# Key code -> handler; a handler returning 'quit' ends the demo loop
+KEY_HANDLERS: Dict[int, Callable[[DemoState], Optional[str]]] = {
+    ord('q'): _on_quit,
+    ord('m'): _on_toggle_motion,
+    ord('r'): _on_reset,
+    ord('g'): _on_greet,
+    ord('c'): _on_show_ctx,
+    ord('h'): _on_help,
+}
@@ -101,6 +101,16 @@ class MEMOLogger:
             self.console_handler = console_handler
         else:
             self.console_handler = None
+        
+        # Core modules log under "memo.*" without importing utils; give that
+        # namespace the same handlers
+        memo_logger = logging.getLogger("memo")
+        memo_logger.setLevel(self.level)
+        memo_logger.propagate = False
+        memo_logger.handlers.clear()
+        for handler in (self.file_handler, self.console_handler):
+            if handler:
+                memo_logger.addHandler(handler)
     
     def get_logger(self, name: str) -> logging.Logger:
         """
@@ -178,14 +188,14 @@ def log_execution_time(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
         logger = get_logger(func.__module__)
-        start_time = time.time()
+        start_time = time.perf_counter()
         try:
             result = func(*args, **kwargs)
-            elapsed = (time.time() - start_time) * 1000  # Convert to ms
+            elapsed = (time.perf_counter() - start_time) * 1000  # Convert to ms
             logger.debug(f"{func.__name__} executed in {elapsed:.2f}ms")
             return result
         except Exception as e:
-            elapsed = (time.time() - start_time) * 1000
+            elapsed = (time.perf_counter() - start_time) * 1000
             logger.error(f"{func.__name__} failed after {elapsed:.2f}ms: {e}")
             raise
     
@@ -0,0 +1,95 @@
+"""
+MEMO Overlay Helpers
+Text rendering shortcuts for the OpenCV demo windows.
+"""
+
+import cv2
+import numpy as np
+from typing import Optional, Tuple
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+# BGR colors shared by the demo overlays
+YELLOW = (0, 255, 255)
+GREEN = (0, 255, 0)
+GRAY = (200, 200, 200)
+DIM = (100, 100, 100)
+
+
+class TextPanel:
+    """
+    A block of text lines rasterized once and copied onto each frame.
+
+    putText is only called again for lines whose text changed, so labels that
+    update once a second cost one masked copy per frame instead of a putText each.
+    Lines are expected not to overlap vertically.
+    """
+
+    def __init__(self, width: int, height: int):
+        """
+        Args:
+            width: Panel width in pixels
+            height: Panel height in pixels
+        """
+        self.width = width
+        self.height = height
+        self._lines: Optional[Tuple] = None
+        self._panel = np.zeros((height, width, 3), dtype=np.uint8)
+        self._mask = np.zeros((height, width, 1), dtype=bool)
+
+    def _band(self, line: Tuple) -> Tuple[int, int]:
+        """Rows a line's glyphs can touch (ascent to descent plus stroke)."""
+        text, (_, py), scale, _, thickness = line
+        (_, text_h), baseline = cv2.getTextSize(text, FONT, scale, thickness)
+        return max(py - text_h - thickness, 0), min(py + baseline + thickness, self.height)
+
+    def _render(self, lines: Tuple) -> None:
+        old = self._lines
+        if old is None or len(old) != len(lines):
+            self._panel[:] = 0
+            for text, org, scale, color, thickness in lines:
+                cv2.putText(self._panel, text, org, FONT, scale, color, thickness)
+            self._mask = self._panel.any(axis=2, keepdims=True)
+        else:
+            # Only re-rasterize the lines that changed (usually just the clock)
+            for prev, line in zip(old, lines):
+                if prev == line:
+                    continue
+                y0, y1 = self._band(prev)
+                n0, n1 = self._band(line)
+                y0, y1 = min(y0, n0), max(y1, n1)
+                self._panel[y0:y1] = 0
+                text, org, scale, color, thickness = line
+                cv2.putText(self._panel, text, org, FONT, scale, color, thickness)
+                self._mask[y0:y1] = self._panel[y0:y1].any(axis=2, keepdims=True)
+        self._lines = lines
+
+    def draw(self, frame: np.ndarray, x: int, y: int, lines: Tuple) -> None:
+        """
+        Draw lines onto frame with the panel's top-left corner at (x, y).
+
+        Args:
+            frame: BGR frame, modified in place
+            x, y: Panel position in the frame
+            lines: Tuple of (text, (px, py), scale, color, thickness) entries,
+                   positioned relative to the panel
+        """
+        if lines != self._lines:
+            self._render(lines)
+
+        roi = frame[y:y + self.height, x:x + self.width]
+        rh, rw = roi.shape[:2]
+        np.copyto(roi, self._panel[:rh, :rw], where=self._mask[:rh, :rw])
+
+
+def put_lines(frame: np.ndarray, lines, x: int, y: int, step: int, scale: float, thickness: int) -> int:
+    """
+    Draw (text, color) lines top to bottom with one font setting.
+
+    Returns:
+        The y of the next line after the last one drawn
+    """
+    for text, color in lines:
+        cv2.putText(frame, text, (x, y), FONT, scale, color, thickness)
+        y += step
+    return y